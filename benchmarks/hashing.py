@@ -0,0 +1,81 @@
+"""Hash and verify latency for argon2 parameter sets.
+
+    python -m benchmarks.hashing
+    python -m benchmarks.hashing --rounds 50 2:19456:1 3:65536:4
+
+Each set is `time_cost:memory_cost:parallelism`, memory in KiB. The set
+from the current settings always runs first.
+"""
+
+import argparse
+from statistics import mean, quantiles
+from time import perf_counter
+
+from fast_zero.hashing import build_context
+from fast_zero.settings import settings
+
+DEFAULT_SETS = ['1:47104:1', '2:19456:1', '3:12288:1', '4:9216:1']
+
+
+def parse_set(value: str):
+    time_cost, memory_cost, parallelism = map(int, value.split(':'))
+
+    return time_cost, memory_cost, parallelism
+
+
+def summarize(timings):
+    percentiles = quantiles(timings, n=100, method='inclusive')
+
+    return {
+        'mean': mean(timings),
+        'p50': percentiles[49],
+        'p99': percentiles[98],
+        'max': max(timings),
+    }
+
+
+def measure(params, rounds: int):
+    context = build_context(*params)
+    timings = {'hash': [], 'verify': []}
+
+    for _ in range(rounds):
+        start = perf_counter()
+        hashed = context.hash('benchmark-password')
+        timings['hash'].append((perf_counter() - start) * 1000)
+
+        start = perf_counter()
+        context.verify('benchmark-password', hashed)
+        timings['verify'].append((perf_counter() - start) * 1000)
+
+    return {name: summarize(values) for name, values in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('sets', nargs='*', type=parse_set)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    current = (
+        settings.PASSWORD_HASH_TIME_COST,
+        settings.PASSWORD_HASH_MEMORY_COST,
+        settings.PASSWORD_HASH_PARALLELISM,
+    )
+    sets = args.sets or [parse_set(value) for value in DEFAULT_SETS]
+
+    columns = ' '.join(f'{key:>8}' for key in ('mean', 'p50', 'p99', 'max'))
+    print(f'{"t:m:p":>16} {"op":>6} {columns}')
+
+    for params in [current, *(p for p in sets if p != current)]:
+        results = measure(params, args.rounds)
+        label = ':'.join(map(str, params))
+
+        for name, result in results.items():
+            print(
+                f'{label:>16} {name:>6} '
+                + ' '.join(f'{result[key]:>6.1f}ms' for key in result)
+            )
+
+
+if __name__ == '__main__':
+    main()
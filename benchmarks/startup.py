@@ -0,0 +1,115 @@
+"""Cold start: import time per module and time to the first request.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --top 30 --no-serve
+
+The import report runs `python -X importtime -c "import fast_zero.app"`
+in a fresh interpreter and lists the slowest modules by cumulative
+time, then the total per top-level package. The request timing starts
+`fast_zero.serve` with one worker and polls `/` until it answers.
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+from collections import Counter
+from time import perf_counter, sleep
+from urllib.error import URLError
+from urllib.request import urlopen
+
+
+def import_times():
+    """`(module, self_us, cumulative_us)` for every import of the app."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import fast_zero.app'],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+
+    for line in result.stderr.splitlines()[1:]:
+        head, cumulative, module = line.split('|')
+        self_time = int(head.removeprefix('import time:'))
+        times.append((module.strip(), self_time, int(cumulative)))
+
+    return times
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+
+        return sock.getsockname()[1]
+
+
+def time_to_first_request(timeout: float):
+    port = free_port()
+    env = os.environ | {
+        'SERVER_HOST': '127.0.0.1',
+        'SERVER_PORT': str(port),
+        'SERVER_WORKERS': '1',
+    }
+    start = perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'fast_zero.serve'],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        while perf_counter() - start < timeout:
+            try:
+                with urlopen(f'http://127.0.0.1:{port}/', timeout=1):
+                    return perf_counter() - start
+            except (URLError, ConnectionError):
+                sleep(0.01)
+
+        return None
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--no-serve', action='store_true')
+    parser.add_argument('--timeout', type=float, default=30)
+    args = parser.parse_args()
+
+    times = import_times()
+    packages = Counter()
+
+    for module, self_time, _ in times:
+        packages[module.split('.')[0]] += self_time
+
+    print(f'{"cumulative":>12} {"self":>10}  module')
+
+    for module, self_time, cumulative in sorted(
+        times, key=lambda item: item[2], reverse=True
+    )[: args.top]:
+        print(
+            f'{cumulative / 1000:>10.1f}ms',
+            f'{self_time / 1000:>8.1f}ms ',
+            module,
+        )
+
+    print(f'\n{"total":>12}  package')
+
+    for package, self_time in packages.most_common(args.top):
+        print(f'{self_time / 1000:>10.1f}ms  {package}')
+
+    if not args.no_serve:
+        elapsed = time_to_first_request(args.timeout)
+        print(
+            '\nfirst request: '
+            + (f'{elapsed * 1000:.0f}ms' if elapsed else 'timed out')
+        )
+
+
+if __name__ == '__main__':
+    main()
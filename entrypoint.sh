@@ -1,7 +1,7 @@
 #!/bin/sh
 
-# Executa as migrações do banco de dados
-poetry run alembic upgrade head
+# Executa as migrações pendentes do banco de dados, se houver
+python -m fast_zero.migrate
 
 # Inicia a aplicação
-poetry run fastapi run fast_zero/app.py
+exec python -m fast_zero.serve
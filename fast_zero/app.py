@@ -1,17 +1,45 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from http import HTTPStatus
 
 from fastapi import FastAPI
 
-from fast_zero.routers import auth, todos, users
+from fast_zero.compression import CompressionMiddleware
+from fast_zero.database import engine
+from fast_zero.hashing import hash_pool
+from fast_zero.responses import FastJSONResponse
+from fast_zero.routers import auth, health, internal, todos, users
 from fast_zero.schemas import (
     MessageSchema,
 )
+from fast_zero.warmup import warm_up
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # In the background, so /health/live answers while warming up
+    warming = asyncio.create_task(warm_up(engine))
+
+    yield
+
+    warming.cancel()
+
+    with suppress(asyncio.CancelledError):
+        await warming
+
+    hash_pool.shutdown()
+    await engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+app.add_middleware(CompressionMiddleware)
 
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(todos.router)
+app.include_router(internal.router)
+app.include_router(health.router)
 
 
 @app.get('/', status_code=HTTPStatus.OK, response_model=MessageSchema)
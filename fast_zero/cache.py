@@ -0,0 +1,251 @@
+import json
+from collections import OrderedDict
+from collections.abc import Iterable
+from time import monotonic
+
+from fast_zero.settings import settings
+from fast_zero.store import shared_client
+
+
+class TTLCache:
+    """Bounded in-process LRU cache whose entries expire after `ttl` seconds.
+
+    The cache is per process: other workers only see a change once their
+    own entry expires, so `ttl` bounds how stale a value can get. Callers
+    report what a miss cost through `record_load`, which gives an
+    estimate of the time the hits saved.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_count = 0
+        self.load_time_total = 0.0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+
+        if entry is None or entry[0] <= monotonic():
+            if entry is not None:
+                del self._entries[key]
+
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        return entry[1]
+
+    def set(self, key, value, ttl: float | None = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+
+        if self.max_size <= 0 or ttl <= 0:
+            return
+
+        self._entries[key] = (monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def record_load(self, elapsed: float):
+        self.load_count += 1
+        self.load_time_total += elapsed
+
+    def invalidate(self, key):
+        self._entries.pop(key, None)
+
+    def invalidate_matching(self, predicate):
+        """Drop every entry whose value satisfies `predicate`."""
+        keys = [
+            key
+            for key, (_, value) in self._entries.items()
+            if predicate(value)
+        ]
+
+        for key in keys:
+            del self._entries[key]
+
+        return len(keys)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        load_time_avg = (
+            self.load_time_total / self.load_count if self.load_count else 0.0
+        )
+
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'time_saved': self.hits * load_time_avg,
+        }
+
+
+class MemoryResponseBackend:
+    """Response entries in a per-process `TTLCache`.
+
+    Invalidation scans the entries for matching tags, which is cheap at
+    this size and keeps no separate index to maintain.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.entries = TTLCache(max_size, ttl)
+
+    async def get(self, key: str):
+        entry = self.entries.get(key)
+
+        return entry and entry[0]
+
+    async def set(self, key: str, value, tags: frozenset[str]):
+        self.entries.set(key, (value, tags))
+
+    async def invalidate(self, tags: frozenset[str]):
+        self.entries.invalidate_matching(lambda entry: entry[1] & tags)
+
+    async def clear(self):
+        self.entries.clear()
+
+    def size(self):
+        return self.entries.stats()['size']
+
+
+class SharedResponseBackend:
+    """Response entries in a shared key-value store, seen by every worker.
+
+    `client` needs the async `get`, `set(ex=)`, `delete`, `sadd`,
+    `expire`, `smembers` and `scan_iter` of a Redis client. Each tag is
+    a set of the keys it covers, expiring `ttl` after its last addition,
+    by which time every key it names has expired too.
+    """
+
+    def __init__(self, client, ttl: float, prefix: str = 'fast_zero:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str):
+        raw = await self.client.get(self.prefix + key)
+
+        return raw and tuple(json.loads(raw))
+
+    async def set(self, key: str, value, tags: frozenset[str]):
+        await self.client.set(
+            self.prefix + key, json.dumps(value), ex=int(self.ttl)
+        )
+
+        for tag in tags:
+            tag_key = f'{self.prefix}tag:{tag}'
+            await self.client.sadd(tag_key, key)
+            await self.client.expire(tag_key, int(self.ttl))
+
+    async def invalidate(self, tags: frozenset[str]):
+        for tag in tags:
+            tag_key = f'{self.prefix}tag:{tag}'
+            keys = await self.client.smembers(tag_key)
+            await self.client.delete(
+                tag_key,
+                *(
+                    self.prefix
+                    + (key.decode() if isinstance(key, bytes) else key)
+                    for key in keys
+                ),
+            )
+
+    async def clear(self):
+        keys = [key async for key in self.client.scan_iter(f'{self.prefix}*')]
+
+        if keys:
+            await self.client.delete(*keys)
+
+    @staticmethod
+    def size():
+        return None
+
+
+class ResponseCache:
+    """Rendered responses keyed by route and parameters.
+
+    Entries carry tags naming what they depend on, so writes invalidate
+    exactly the entries they can change. The backend is swappable, see
+    `MemoryResponseBackend` and `SharedResponseBackend`.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, key: str):
+        value = await self.backend.get(key)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return value
+
+    async def set(self, key: str, value, tags: Iterable[str]):
+        await self.backend.set(key, value, frozenset(tags))
+
+    async def invalidate(self, *tags: str):
+        self.invalidations += 1
+        await self.backend.invalidate(frozenset(tags))
+
+    async def clear(self):
+        await self.backend.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+
+        return {
+            'backend': type(self.backend).__name__,
+            'size': self.backend.size(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'invalidations': self.invalidations,
+        }
+
+
+def build_response_backend():
+    """The backend RESPONSE_CACHE_BACKEND names.
+
+    Only `shared` invalidates entries in every worker; with `memory`
+    other workers serve their own copy until it expires.
+    """
+    if settings.RESPONSE_CACHE_BACKEND == 'shared':
+        # Its own prefix, so clear() leaves other shared state alone
+        return SharedResponseBackend(
+            shared_client(),
+            settings.RESPONSE_CACHE_TTL_SECONDS,
+            prefix='fast_zero:responses:',
+        )
+
+    return MemoryResponseBackend(
+        settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_TTL_SECONDS
+    )
+
+
+user_cache = TTLCache(
+    settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS
+)
+token_cache = TTLCache(
+    settings.TOKEN_CACHE_SIZE, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+response_cache = ResponseCache(build_response_backend())
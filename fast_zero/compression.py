@@ -0,0 +1,175 @@
+import zlib
+from functools import cache
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from fast_zero.settings import settings
+
+
+@cache
+def load_brotli():
+    """The `brotli` module, imported on the first br request."""
+    import brotli  # noqa: PLC0415
+
+    return brotli
+
+
+class GzipCompressor:
+    encoding = 'gzip'
+
+    def __init__(self, level: int):
+        # wbits 16 + 15 writes a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + 15)
+
+    def compress(self, data: bytes):
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self, data: bytes = b''):
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class BrotliCompressor:
+    encoding = 'br'
+
+    def __init__(self, quality: int):
+        self._compressor = load_brotli().Compressor(quality=quality)
+
+    def compress(self, data: bytes):
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b''):
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+def accepted_encodings(header: str):
+    """An Accept-Encoding header as `{encoding: accepted}`.
+
+    Encodings at q=0, or whose q does not parse, map to False.
+    """
+    accepted = {}
+
+    for item in header.split(','):
+        encoding, *params = item.split(';')
+        encoding = encoding.strip().lower()
+
+        if not encoding:
+            continue
+
+        accepted[encoding] = True
+
+        for param in params:
+            name, _, value = param.partition('=')
+
+            if name.strip().lower() != 'q':
+                continue
+
+            try:
+                accepted[encoding] = float(value.strip()) > 0
+            except ValueError:
+                accepted[encoding] = False
+
+    return accepted
+
+
+def negotiate(scope):
+    """The first COMPRESSION_ENCODINGS entry the client accepts.
+
+    `*` only stands for encodings the header does not name, so an
+    explicit q=0 still refuses one.
+    """
+    accepted = accepted_encodings(
+        Headers(scope=scope).get('accept-encoding', '')
+    )
+
+    for encoding in settings.COMPRESSION_ENCODINGS:
+        if encoding in {'br', 'gzip'} and accepted.get(
+            encoding, accepted.get('*', False)
+        ):
+            return encoding
+
+    return None
+
+
+def build_compressor(encoding: str):
+    if encoding == 'br':
+        return BrotliCompressor(settings.COMPRESSION_BROTLI_QUALITY)
+
+    return GzipCompressor(settings.COMPRESSION_GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip, as the client accepts.
+
+    Encodings are tried in COMPRESSION_ENCODINGS order. Whole bodies
+    under COMPRESSION_MINIMUM_SIZE and responses that already carry a
+    Content-Encoding go out as they are. Streamed bodies are compressed
+    chunk by chunk, each chunk flushed so clients can decode it as it
+    arrives.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        encoding = scope['type'] == 'http' and negotiate(scope)
+
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+        compressor = None
+
+        async def send_compressed(message):
+            nonlocal start, passthrough, compressor
+
+            if message['type'] == 'http.response.start':
+                start = message
+                return
+
+            if message['type'] != 'http.response.body' or passthrough:
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+            if start is None:
+                await send({
+                    **message,
+                    'body': compressor.compress(body)
+                    if more_body
+                    else compressor.finish(body),
+                })
+                return
+
+            headers = MutableHeaders(raw=start['headers'])
+
+            if 'content-encoding' in headers or (
+                not more_body and len(body) < settings.COMPRESSION_MINIMUM_SIZE
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            # Only built once the response is known to need it
+            compressor = build_compressor(encoding)
+            headers['Content-Encoding'] = compressor.encoding
+            headers.add_vary_header('Accept-Encoding')
+
+            if more_body:
+                del headers['Content-Length']
+                body = compressor.compress(body)
+            else:
+                body = compressor.finish(body)
+                headers['Content-Length'] = str(len(body))
+
+            await send(start)
+            start = None
+            await send({**message, 'body': body})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,11 +1,262 @@
-from sqlalchemy import create_engine
+from time import monotonic, perf_counter
+
+from fastapi import Request
+from jwt import PyJWTError, decode
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError, TimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from fast_zero.settings import settings
 
-engine = create_engine(settings.DATABASE_URL)
 
+class PoolStats:
+    """Counters fed by the pool events of the application engine."""
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.hold_time_total = 0.0
+        self.hold_time_max = 0.0
+
+    def record_wait(self, elapsed: float):
+        self.wait_count += 1
+        self.wait_time_total += elapsed
+        self.wait_time_max = max(self.wait_time_max, elapsed)
+
+    def record_hold(self, elapsed: float):
+        self.hold_time_total += elapsed
+        self.hold_time_max = max(self.hold_time_max, elapsed)
+
+
+pool_stats = PoolStats()
+
+
+class MonitoredPool(AsyncAdaptedQueuePool):
+    """Queue pool that times how long callers wait for a connection."""
+
+    def _do_get(self):
+        start = perf_counter()
+
+        try:
+            return super()._do_get()
+        except TimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.record_wait(perf_counter() - start)
+
+
+def build_engine(url: str, **kwargs):
+    return create_async_engine(
+        url,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        pool_use_lifo=settings.DATABASE_POOL_USE_LIFO,
+        **kwargs,
+    )
+
+
+engine = build_engine(settings.DATABASE_URL, poolclass=MonitoredPool)
+
+
+@event.listens_for(engine.sync_engine, 'connect')
+def on_connect(dbapi_connection, connection_record):
+    pool_stats.connects += 1
+
+
+@event.listens_for(engine.sync_engine, 'checkout')
+def on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_stats.checkouts += 1
+    connection_record.info['checked_out_at'] = perf_counter()
+
+
+@event.listens_for(engine.sync_engine, 'checkin')
+def on_checkin(dbapi_connection, connection_record):
+    pool_stats.checkins += 1
+    checked_out_at = connection_record.info.pop('checked_out_at', None)
+
+    if checked_out_at is not None:
+        pool_stats.record_hold(perf_counter() - checked_out_at)
+
+
+@event.listens_for(engine.sync_engine, 'invalidate')
+def on_invalidate(dbapi_connection, connection_record, exception):
+    pool_stats.invalidations += 1
+
+
+def get_pool_status():
+    pool = engine.sync_engine.pool
+    average_wait = (
+        pool_stats.wait_time_total / pool_stats.wait_count
+        if pool_stats.wait_count
+        else 0.0
+    )
+
+    return {
+        'size': pool.size(),
+        'checked_out': pool.checkedout(),
+        'idle': pool.checkedin(),
+        'overflow': max(pool.overflow(), 0),
+        'max_overflow': settings.DATABASE_MAX_OVERFLOW,
+        'connects': pool_stats.connects,
+        'checkouts': pool_stats.checkouts,
+        'checkins': pool_stats.checkins,
+        'invalidations': pool_stats.invalidations,
+        'timeouts': pool_stats.timeouts,
+        'wait_count': pool_stats.wait_count,
+        'wait_time_avg': average_wait,
+        'wait_time_max': pool_stats.wait_time_max,
+        'hold_time_max': pool_stats.hold_time_max,
+    }
+
+
+class ReplicaRouter:
+    """Spread reads over replicas, falling back to the primary.
+
+    Replicas are tried round-robin; one that fails to hand out a
+    connection is skipped for `retry_after` seconds. Readers that
+    committed a write less than `write_window` seconds ago stay on the
+    primary so they see their own changes.
+    """
+
+    MAX_TRACKED_WRITERS = 10_000
+
+    def __init__(self, primary, replicas, retry_after, write_window):
+        self.primary = primary
+        self.replicas = replicas
+        self.retry_after = retry_after
+        self.write_window = write_window
+        self._next = 0
+        self._down_until = {}
+        self._writes = {}
+
+    def mark_write(self, key: str):
+        now = monotonic()
+
+        if len(self._writes) >= self.MAX_TRACKED_WRITERS:
+            self._writes = {
+                writer: deadline
+                for writer, deadline in self._writes.items()
+                if deadline > now
+            }
+
+        self._writes[key] = now + self.write_window
+
+    def wrote_recently(self, key: str):
+        deadline = self._writes.get(key)
+
+        if deadline is None:
+            return False
+
+        if deadline <= monotonic():
+            self._writes.pop(key, None)
+            return False
+
+        return True
+
+    def _candidates(self):
+        now = monotonic()
+        start = self._next
+        self._next = (start + 1) % len(self.replicas)
+
+        for offset in range(len(self.replicas)):
+            index = (start + offset) % len(self.replicas)
+
+            if self._down_until.get(index, 0) <= now:
+                yield index, self.replicas[index]
+
+    async def open_session(self, key: str | None = None):
+        if self.replicas and not (key and self.wrote_recently(key)):
+            for index, replica in self._candidates():
+                session = AsyncSession(
+                    replica, expire_on_commit=False, info={'replica': True}
+                )
+
+                try:
+                    await session.connection()
+                except (OperationalError, OSError):
+                    await session.close()
+                    self._down_until[index] = monotonic() + self.retry_after
+                    continue
+
+                return session
+
+        return AsyncSession(self.primary, expire_on_commit=False)
+
+
+replica_router = ReplicaRouter(
+    engine,
+    [build_engine(url) for url in settings.DATABASE_REPLICA_URLS],
+    retry_after=settings.DATABASE_REPLICA_RETRY_SECONDS,
+    write_window=settings.DATABASE_READ_YOUR_WRITES_SECONDS,
+)
+
+
+@event.listens_for(Session, 'after_commit')
+def on_commit(session):
+    writer = session.info.get('writer')
+
+    if writer:
+        replica_router.mark_write(writer)
+
+
+def get_request_subject(request: Request):
+    """Token subject used as the read-your-writes key.
+
+    The signature is not checked: the subject only routes reads, and
+    authentication still happens in `get_current_user`.
+    """
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+
+    if scheme.lower() != 'bearer' or not token:
+        return None
+
+    try:
+        return decode(token, options={'verify_signature': False}).get('sub')
+    except PyJWTError:
+        return None
+
+
+async def scalar_or_primary(session: AsyncSession, statement):
+    """Run a single-row read, retrying on the primary if a replica misses.
+
+    Covers rows written moments ago that a lagging replica does not
+    have yet.
+    """
+    result = await session.scalar(statement)
+
+    if result is None and session.info.get('replica'):
+        async with AsyncSession(
+            replica_router.primary, expire_on_commit=False
+        ) as primary:
+            result = await primary.scalar(statement)
+
+    return result
+
+
+async def get_session(request: Request):  # pragma: no cover
+    writer = get_request_subject(request) if replica_router.replicas else None
+
+    async with AsyncSession(
+        engine, expire_on_commit=False, info={'writer': writer}
+    ) as session:
+        yield session
+
+
+async def get_read_session(request: Request):  # pragma: no cover
+    reader = get_request_subject(request) if replica_router.replicas else None
+    session = await replica_router.open_session(reader)
 
-def get_session():  # pragma: no cover
-    with Session(engine) as session:
+    async with session:
         yield session
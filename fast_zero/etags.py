@@ -0,0 +1,36 @@
+from hashlib import blake2b
+from http import HTTPStatus
+
+from fastapi import Request, Response
+
+
+def weak_etag(*parts):
+    """Weak validator over `parts`, whose reprs must be stable."""
+    digest = blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+    return f'W/"{digest}"'
+
+
+def wants_validation(request: Request):
+    return 'if-none-match' in request.headers
+
+
+def etag_matches(request: Request, etag: str):
+    """Weak comparison of `etag` against the If-None-Match header."""
+    header = request.headers.get('if-none-match', '')
+
+    if header.strip() == '*':
+        return True
+
+    opaque = etag.removeprefix('W/')
+
+    return any(
+        candidate.strip().removeprefix('W/') == opaque
+        for candidate in header.split(',')
+    )
+
+
+def not_modified(etag: str):
+    return Response(
+        status_code=HTTPStatus.NOT_MODIFIED, headers={'ETag': etag}
+    )
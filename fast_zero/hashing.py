@@ -0,0 +1,153 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import cache
+from time import perf_counter
+
+from fast_zero.settings import settings
+
+
+def build_context(time_cost: int, memory_cost: int, parallelism: int):
+    # Imported on first use, argon2 is only needed by the processes that hash
+    from pwdlib import PasswordHash  # noqa: PLC0415
+    from pwdlib.hashers.argon2 import Argon2Hasher  # noqa: PLC0415
+
+    return PasswordHash((
+        Argon2Hasher(
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism,
+        ),
+    ))
+
+
+@cache
+def pwd_context():
+    return build_context(
+        settings.PASSWORD_HASH_TIME_COST,
+        settings.PASSWORD_HASH_MEMORY_COST,
+        settings.PASSWORD_HASH_PARALLELISM,
+    )
+
+
+def hash_password(password: str):
+    return pwd_context().hash(password)
+
+
+def check_and_update_password(password: str, hashed_password: str):
+    """Verify a password, returning a new hash if its parameters changed."""
+    return pwd_context().verify_and_update(password, hashed_password)
+
+
+class HashPoolBusy(Exception):
+    """Raised when the hash queue is full or a worker process died."""
+
+
+class HashPool:
+    """Runs argon2 calls on a process pool, off the event loop.
+
+    At most `workers` calls run at once. Up to `queue_size` more wait for
+    a free worker, anything past that raises `HashPoolBusy` right away.
+    With `workers=0` calls run inline, which is meant for development.
+
+    If a worker process dies, e.g. killed for memory, the executor is
+    broken for good: it is dropped so the next call starts a new one,
+    and the calls it took down raise `HashPoolBusy`.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.restarts = 0
+        self.wait_count = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self._executor = None
+        self._slots = asyncio.Semaphore(max(workers, 1))
+
+    def executor(self):
+        # Created on first use, so forked server workers get their own
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+
+        return self._executor
+
+    def record_wait(self, elapsed: float):
+        self.wait_count += 1
+        self.wait_time_total += elapsed
+        self.wait_time_max = max(self.wait_time_max, elapsed)
+
+    async def run(self, function, *args):
+        if not self.workers:
+            self.completed += 1
+            return function(*args)
+
+        if self._slots.locked() and self.queued >= self.queue_size:
+            self.rejected += 1
+            raise HashPoolBusy()
+
+        self.queued += 1
+        start = perf_counter()
+
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+
+        self.record_wait(perf_counter() - start)
+        self.in_flight += 1
+
+        executor = self.executor()
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, function, *args
+            )
+        except BrokenProcessPool:
+            self.discard(executor)
+            raise HashPoolBusy()
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._slots.release()
+
+    def discard(self, executor):
+        # Calls that were running on it all fail, drop it only once
+        if self._executor is executor:
+            self._executor = None
+            self.restarts += 1
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'queue_size': self.queue_size,
+            'queued': self.queued,
+            'in_flight': self.in_flight,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'restarts': self.restarts,
+            'wait_count': self.wait_count,
+            'wait_time_avg': self.wait_time_total / self.wait_count
+            if self.wait_count
+            else 0.0,
+            'wait_time_max': self.wait_time_max,
+        }
+
+
+hash_pool = HashPool(
+    settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_SIZE
+)
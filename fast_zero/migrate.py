@@ -0,0 +1,57 @@
+"""Bring the schema to head, `python -m fast_zero.migrate`.
+
+Reading the current revision is a single query, so a boot against an
+up-to-date database skips Alembic's environment and the models import.
+"""
+
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from fast_zero.settings import settings
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def alembic_config():
+    config = Config(str(ROOT / 'alembic.ini'))
+    config.set_main_option('script_location', str(ROOT / 'migrations'))
+
+    return config
+
+
+def current_heads(url: str):
+    engine = create_engine(url, poolclass=NullPool)
+
+    try:
+        with engine.connect() as connection:
+            return set(
+                MigrationContext.configure(connection).get_current_heads()
+            )
+    finally:
+        engine.dispose()
+
+
+def is_at_head(config: Config, url: str):
+    return current_heads(url) == set(
+        ScriptDirectory.from_config(config).get_heads()
+    )
+
+
+def main():  # pragma: no cover
+    config = alembic_config()
+
+    if is_at_head(config, settings.DATABASE_URL):
+        print('Schema is at head, skipping migrations')
+        return
+
+    command.upgrade(config, 'head')
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -1,12 +1,29 @@
 from datetime import datetime, timezone
 from enum import Enum
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import DDL, Computed, ForeignKey, Index, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, registry
 
+from fast_zero.settings import settings
+
 table_registry = registry()
 
 
+def utcnow():
+    # Called per statement, ETags rely on updated_at moving on every write
+    return datetime.now(timezone.utc)
+
+
+event.listen(
+    table_registry.metadata,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(
+        dialect='postgresql'
+    ),
+)
+
+
 class TodoState(str, Enum):
     draft = 'draft'
     todo = 'todo'
@@ -15,6 +32,17 @@ class TodoState(str, Enum):
     trash = 'trash'
 
 
+def todo_search_vector(language: str):
+    """Expression of the generated full-text column on todos.
+
+    Title lexemes weigh more than description ones in `ts_rank`.
+    """
+    return (
+        f"setweight(to_tsvector('{language}', title), 'A') || "
+        f"setweight(to_tsvector('{language}', description), 'B')"
+    )
+
+
 @table_registry.mapped_as_dataclass
 class User:
     __tablename__ = 'users'
@@ -23,31 +51,57 @@ class User:
     username: Mapped[str] = mapped_column(unique=True)
     email: Mapped[str] = mapped_column(unique=True)
     password: Mapped[str]
-    created_at: Mapped[datetime] = mapped_column(
-        init=False, default=datetime.now(timezone.utc)
-    )
+    created_at: Mapped[datetime] = mapped_column(init=False, default=utcnow)
     updated_at: Mapped[datetime] = mapped_column(
-        init=False,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        init=False, default=utcnow, onupdate=utcnow
+    )
+    # Bumped on every update, tokens carry it in the `ver` claim
+    version: Mapped[int] = mapped_column(
+        init=False, default=1, server_default='1'
     )
 
 
 @table_registry.mapped_as_dataclass
 class Todo:
     __tablename__ = 'todos'
+    __table_args__ = (
+        Index('ix_todos_user_id_state_id', 'user_id', 'state', 'id'),
+        Index('ix_todos_user_id_id', 'user_id', 'id'),
+        Index(
+            'ix_todos_title_trgm',
+            'title',
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops'},
+        ),
+        Index(
+            'ix_todos_description_trgm',
+            'description',
+            postgresql_using='gin',
+            postgresql_ops={'description': 'gin_trgm_ops'},
+        ),
+        Index(
+            'ix_todos_search_vector',
+            'search_vector',
+            postgresql_using='gin',
+        ),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     title: Mapped[str]
     description: Mapped[str]
     state: Mapped[TodoState]
-    created_at: Mapped[datetime] = mapped_column(
-        init=False, default=datetime.now(timezone.utc)
-    )
+    created_at: Mapped[datetime] = mapped_column(init=False, default=utcnow)
     updated_at: Mapped[datetime] = mapped_column(
+        init=False, default=utcnow, onupdate=utcnow
+    )
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            todo_search_vector(settings.TODO_SEARCH_LANGUAGE), persisted=True
+        ),
         init=False,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        deferred=True,
+        repr=False,
     )
 
     user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
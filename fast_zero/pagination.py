@@ -0,0 +1,101 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Callable
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Any
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.etags import etag_matches, not_modified, wants_validation
+from fast_zero.responses import FastJSONResponse
+
+
+def encode_cursor(**key):
+    """Opaque cursor holding the sort key of the last row of a page."""
+    raw = json.dumps(key, separators=(',', ':')).encode()
+
+    return urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, **fields: type):
+    """Read back the sort key, coercing each field to the given type."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        key = json.loads(urlsafe_b64decode(padded))
+
+        return {name: type_(key[name]) for name, type_ in fields.items()}
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Invalid cursor',
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Listing:
+    """A list endpoint paged by `limit`, with a cursor and an ETag.
+
+    `schema` holds the rows of `model` in `field` next to `next_cursor`,
+    and `cursor` encodes the sort key of a row for the next page.
+    """
+
+    model: Any
+    schema: type[BaseModel]
+    field: str
+    cursor: Callable
+
+    async def read(
+        self,
+        request: Request,
+        session: AsyncSession,
+        query,
+        limit: int,
+        etag: Callable,
+    ):
+        """Answer with one page of `query`, or with 304 if it is unchanged.
+
+        `query` selects `model` first and is already ordered and offset.
+        `etag` turns the `(id, updated_at)` keys of the rows, look-ahead
+        row included, into the ETag, so it also changes when a following
+        page appears or goes away.
+
+        Returns the response and the rows read, or no rows for a 304.
+        """
+        # One extra row tells whether another page follows
+        query = query.limit(limit + 1)
+
+        # A conditional request only needs the page keys to answer 304
+        if wants_validation(request):
+            keys = await session.execute(
+                query.with_only_columns(self.model.id, self.model.updated_at)
+            )
+            page_etag = etag([tuple(key) for key in keys])
+
+            if etag_matches(request, page_etag):
+                return not_modified(page_etag), None
+
+        rows = await session.execute(query)
+        rows = rows.all()
+        page = rows[:limit]
+        has_more = len(rows) > limit
+
+        # Validated once here, FastAPI skips response_model for a Response
+        response = FastJSONResponse(
+            self.schema.model_validate(
+                {
+                    self.field: [row[0] for row in page],
+                    'next_cursor': self.cursor(page[-1])
+                    if page and has_more
+                    else None,
+                },
+                from_attributes=True,
+            ),
+            headers={
+                'ETag': etag([(row[0].id, row[0].updated_at) for row in rows])
+            },
+        )
+
+        return response, rows
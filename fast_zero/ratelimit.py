@@ -0,0 +1,192 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from http import HTTPStatus
+from math import ceil
+from time import monotonic
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import OAuth2PasswordRequestForm
+
+from fast_zero.settings import settings
+from fast_zero.store import shared_client
+
+
+class MemoryBackend:
+    """Token buckets held in this process, least recently used first out.
+
+    Each worker has its own, see `SharedBackend` for buckets every
+    worker sees. Evicting a bucket only resets it to full.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+
+    async def take(self, key: str, capacity: float, per_second: float):
+        """Take one token, returning 0 or the seconds until one is free."""
+        now = monotonic()
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * per_second)
+
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / per_second
+
+        self._buckets[key] = (tokens - 1, now)
+        self._buckets.move_to_end(key)
+
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return 0.0
+
+    async def clear(self):
+        self._buckets.clear()
+
+
+class SharedBackend:
+    """Token buckets in a shared store, the same for every worker.
+
+    `client` needs the async `eval` and `scan_iter` of a Redis client.
+    Each bucket is a hash read and updated by one script, so takes from
+    several workers at once stay atomic. A bucket expires once it would
+    be full again.
+    """
+
+    TAKE = """
+    local capacity = tonumber(ARGV[1])
+    local per_second = tonumber(ARGV[2])
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(bucket[1]) or capacity
+    local updated = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + (now - updated) * per_second)
+    local retry_after = 0
+
+    if tokens < 1 then
+        retry_after = (1 - tokens) / per_second
+    else
+        tokens = tokens - 1
+    end
+
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / per_second) + 1)
+
+    return tostring(retry_after)
+    """
+
+    def __init__(self, client, prefix: str = 'fast_zero:login:'):
+        self.client = client
+        self.prefix = prefix
+
+    async def take(self, key: str, capacity: float, per_second: float):
+        """Take one token, returning 0 or the seconds until one is free."""
+        # Returned as a string, Redis truncates Lua numbers to integers
+        retry_after = await self.client.eval(
+            self.TAKE, 1, self.prefix + key, capacity, per_second
+        )
+
+        return float(retry_after)
+
+    async def clear(self):
+        keys = [key async for key in self.client.scan_iter(f'{self.prefix}*')]
+
+        if keys:
+            await self.client.delete(*keys)
+
+
+class LoginLimiter:
+    """Admission control for password logins.
+
+    Each attempt takes a token from its client IP bucket and then from
+    its account bucket, and at most LOGIN_MAX_IN_FLIGHT attempts are
+    verified at once. Everything is checked before any hashing.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.in_flight = 0
+        self.rejected = 0
+
+    def too_many(self, retry_after: float):
+        self.rejected += 1
+
+        return HTTPException(
+            status_code=HTTPStatus.TOO_MANY_REQUESTS,
+            detail='Too many login attempts',
+            headers={'Retry-After': str(max(ceil(retry_after), 1))},
+        )
+
+    async def check(self, client: str, account: str):
+        buckets = (
+            (
+                f'ip:{client}',
+                settings.LOGIN_IP_BURST,
+                settings.LOGIN_IP_PER_MINUTE,
+            ),
+            (
+                f'account:{account.lower()}',
+                settings.LOGIN_ACCOUNT_BURST,
+                settings.LOGIN_ACCOUNT_PER_MINUTE,
+            ),
+        )
+
+        for key, capacity, per_minute in buckets:
+            retry_after = await self.backend.take(
+                key, capacity, per_minute / 60
+            )
+
+            if retry_after:
+                raise self.too_many(retry_after)
+
+    @contextmanager
+    def slot(self):
+        if self.in_flight >= settings.LOGIN_MAX_IN_FLIGHT:
+            raise self.too_many(1)
+
+        self.in_flight += 1
+
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+
+def build_backend():
+    if settings.LOGIN_RATE_LIMIT_BACKEND == 'shared':
+        return SharedBackend(shared_client())
+
+    return MemoryBackend(settings.LOGIN_RATE_LIMIT_KEYS)
+
+
+login_limiter = LoginLimiter(build_backend())
+
+
+def client_ip(request: Request):
+    """Address of the client behind the proxy, for the per-IP bucket.
+
+    Behind a proxy the peer address is the proxy's own, shared by every
+    client. LOGIN_CLIENT_IP_HEADER names the header the proxy puts the
+    client address in, e.g. `Fly-Client-IP`. Only the last entry is
+    used, the one the proxy added, as a client can send the header too.
+    Only set it when every request goes through that proxy.
+    """
+    if settings.LOGIN_CLIENT_IP_HEADER:
+        forwarded = request.headers.get(settings.LOGIN_CLIENT_IP_HEADER)
+
+        if forwarded:
+            return forwarded.rsplit(',', 1)[-1].strip()
+
+    return request.client.host if request.client else 'unknown'
+
+
+async def admit_login(
+    request: Request,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+):
+    await login_limiter.check(client_ip(request), form_data.username)
+
+    with login_limiter.slot():
+        yield
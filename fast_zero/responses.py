@@ -0,0 +1,17 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded by pydantic-core in a single pass.
+
+    Handlers that already hold a validated schema can return
+    `FastJSONResponse(schema)` directly, skipping FastAPI's response
+    validation and `jsonable_encoder`.
+    """
+
+    @staticmethod
+    def render(content: Any) -> bytes:
+        return to_json(content)
@@ -3,32 +3,38 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from fast_zero.database import get_session
 from fast_zero.models import User
+from fast_zero.ratelimit import admit_login
 from fast_zero.schemas import (
     TokenSchema,
 )
 from fast_zero.security import (
     create_access_token,
-    get_current_user,
-    verify_password,
+    get_current_user_read_only,
+    user_claims,
+    verify_and_update_password,
 )
 
 router = APIRouter(prefix='/auth', tags=['Auth'])
 
 T_OAuth2Form = Annotated[OAuth2PasswordRequestForm, Depends()]
-T_Session = Annotated[Session, Depends(get_session)]
+T_Session = Annotated[AsyncSession, Depends(get_session)]
 
 
-@router.post('/token', response_model=TokenSchema)
-def login_from_access_token(
+@router.post(
+    '/token',
+    response_model=TokenSchema,
+    dependencies=[Depends(admit_login)],
+)
+async def login_from_access_token(
     form_data: T_OAuth2Form,
     session: T_Session,
 ):
-    db_user = session.scalar(
+    db_user = await session.scalar(
         select(User).where(User.email == form_data.username)
     )
 
@@ -38,7 +44,9 @@ def login_from_access_token(
             detail=f'User with email {form_data.username} not found',
         )
 
-    is_verify_password = verify_password(form_data.password, db_user.password)
+    is_verify_password, new_hash = await verify_and_update_password(
+        form_data.password, db_user.password
+    )
 
     if not is_verify_password:
         raise HTTPException(
@@ -46,13 +54,24 @@ def login_from_access_token(
             detail='Incorrect email or password',
         )
 
-    access_token = create_access_token(data={'sub': db_user.email})
+    # Stored with other argon2 parameters, move it to the current ones.
+    # Not a change the user made, so updated_at (and with it the ETags
+    # and cached responses built from it) stays as it was.
+    if new_hash:
+        await session.execute(
+            update(User)
+            .where(User.id == db_user.id)
+            .values(password=new_hash, updated_at=User.updated_at)
+        )
+        await session.commit()
+
+    access_token = create_access_token(data=user_claims(db_user))
 
     return {'access_token': access_token, 'token_type': 'Bearer'}
 
 
 @router.post('/refresh_token', response_model=TokenSchema)
-def refresh_token(User: User = Depends(get_current_user)):
-    mew_access_token = create_access_token(data={'sub': User.email})
+async def refresh_token(User: User = Depends(get_current_user_read_only)):
+    mew_access_token = create_access_token(data=user_claims(User))
 
     return {'access_token': mew_access_token, 'token_type': 'Bearer'}
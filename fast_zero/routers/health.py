@@ -0,0 +1,31 @@
+from http import HTTPStatus
+
+from fastapi import APIRouter, Response
+
+from fast_zero.schemas import HealthSchema
+from fast_zero.warmup import warmup_state
+
+router = APIRouter(prefix='/health', tags=['Health'])
+
+
+@router.get('/live', response_model=HealthSchema)
+async def read_liveness():
+    return {'status': 'alive'}
+
+
+@router.get('/ready', response_model=HealthSchema)
+async def read_readiness(response: Response):
+    if not warmup_state.ready:
+        response.status_code = HTTPStatus.SERVICE_UNAVAILABLE
+
+        return {
+            'status': 'warming up',
+            'attempts': warmup_state.attempts,
+            'last_error': warmup_state.last_error,
+        }
+
+    return {
+        'status': 'ready',
+        'attempts': warmup_state.attempts,
+        'warmup_seconds': warmup_state.seconds,
+    }
@@ -0,0 +1,63 @@
+from http import HTTPStatus
+from secrets import compare_digest
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from fast_zero.cache import response_cache, token_cache, user_cache
+from fast_zero.database import get_pool_status
+from fast_zero.hashing import hash_pool
+from fast_zero.schemas import (
+    CacheStatsSchema,
+    HashPoolStatsSchema,
+    PoolStatusSchema,
+    ResponseCacheStatsSchema,
+)
+from fast_zero.settings import settings
+
+
+def require_internal_token(
+    x_internal_token: Annotated[str | None, Header()] = None,
+):
+    """Allow only callers sending INTERNAL_TOKEN in `X-Internal-Token`.
+
+    Without the setting every endpoint here answers 404, as if absent.
+    """
+    if not settings.INTERNAL_TOKEN:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND)
+
+    if not x_internal_token or not compare_digest(
+        x_internal_token.encode(), settings.INTERNAL_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=HTTPStatus.FORBIDDEN,
+            detail='Not enough permissions',
+        )
+
+
+router = APIRouter(
+    prefix='/internal',
+    tags=['Internal'],
+    dependencies=[Depends(require_internal_token)],
+    include_in_schema=False,
+)
+
+
+@router.get('/pool', response_model=PoolStatusSchema)
+async def read_pool_status():
+    return get_pool_status()
+
+
+@router.get('/cache', response_model=dict[str, CacheStatsSchema])
+async def read_cache_stats():
+    return {'users': user_cache.stats(), 'tokens': token_cache.stats()}
+
+
+@router.get('/cache/responses', response_model=ResponseCacheStatsSchema)
+async def read_response_cache_stats():
+    return response_cache.stats()
+
+
+@router.get('/hashing', response_model=HashPoolStatsSchema)
+async def read_hash_pool_stats():
+    return hash_pool.stats()
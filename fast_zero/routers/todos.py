@@ -1,102 +1,565 @@
+import csv
+import json
+from functools import partial
 from http import HTTPStatus
+from io import StringIO, TextIOWrapper
+from itertools import batched
+from tempfile import SpooledTemporaryFile
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import or_, select
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import (
+    Float,
+    and_,
+    cast,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    table,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from fast_zero.database import get_session
+from fast_zero.database import get_read_session, get_session
+from fast_zero.etags import weak_etag
 from fast_zero.models import Todo, User
+from fast_zero.pagination import Listing, decode_cursor, encode_cursor
 from fast_zero.schemas import (
     FilterTodoSchema,
     MessageSchema,
+    SearchMode,
+    TodoBulkResultSchema,
+    TodoBulkSchema,
+    TodoBulkUpdateSchema,
+    TodoExportSchema,
+    TodoFileFormat,
+    TodoImportResultSchema,
     TodoListSchema,
+    TodoMatchSchema,
     TodoPublicSchema,
     TodoSchema,
+    TodoSelectionSchema,
     TodoUpdateSchema,
 )
-from fast_zero.security import get_current_user
+from fast_zero.security import get_current_user, get_current_user_read_only
+from fast_zero.settings import settings
 
 router = APIRouter(prefix='/todos', tags=['Todos'])
 
-T_Session = Annotated[Session, Depends(get_session)]
+T_Session = Annotated[AsyncSession, Depends(get_session)]
 T_CurrentUser = Annotated[User, Depends(get_current_user)]
+T_ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
+T_ReadUser = Annotated[User, Depends(get_current_user_read_only)]
 T_Filter = Annotated[FilterTodoSchema, Query()]
+T_Export = Annotated[TodoExportSchema, Query()]
+T_FileFormat = Annotated[TodoFileFormat, Query(alias='format')]
 
 
 @router.post(
     '/', status_code=HTTPStatus.CREATED, response_model=TodoPublicSchema
 )
-def create_todo(
+async def create_todo(
     todo: TodoSchema, session: T_Session, current_user: T_CurrentUser
 ):
-    db_todo = Todo(
-        title=todo.title,
-        description=todo.description,
-        state=todo.state,
-        user_id=current_user.id,
+    db_todo = await session.scalar(
+        insert(Todo)
+        .values(**todo.model_dump(), user_id=current_user.id)
+        .returning(Todo)
     )
 
-    session.add(db_todo)
-    session.commit()
-    session.refresh(db_todo)
+    await session.commit()
 
     return db_todo
 
 
+@router.post(
+    '/bulk', status_code=HTTPStatus.CREATED, response_model=TodoListSchema
+)
+async def create_todos(
+    todos: TodoBulkSchema, session: T_Session, current_user: T_CurrentUser
+):
+    db_todos = await session.scalars(
+        insert(Todo).returning(Todo, sort_by_parameter_order=True),
+        [
+            {**todo.model_dump(), 'user_id': current_user.id}
+            for todo in todos.todos
+        ],
+    )
+    db_todos = db_todos.all()
+
+    await session.commit()
+
+    return {'todos': db_todos}
+
+
+def search_todos(search: str):
+    """Substring match that the trigram GIN indexes can serve.
+
+    Columns are compared as-is (no lower()/concatenation) so each side
+    of the OR maps onto its own index, and LIKE wildcards typed by the
+    user are escaped so they match literally.
+    """
+    escaped = (
+        search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    )
+    pattern = f'%{escaped}%'
+
+    return or_(
+        Todo.title.ilike(pattern, escape='\\'),
+        Todo.description.ilike(pattern, escape='\\'),
+    )
+
+
+def fulltext_todos(search: str):
+    """Match and rank against the generated `search_vector` column.
+
+    Returns the condition, served by its GIN index, and the rank to
+    order by. The query is parsed with web-search syntax, so quotes,
+    `or` and `-word` work as users expect.
+
+    `ts_rank` is a float4, which reaches Python as its shortest text
+    form rather than its exact value. The rank is widened to float8 in
+    the query, so the value a cursor carries compares equal to the row
+    it came from.
+    """
+    ts_query = func.websearch_to_tsquery(
+        cast(settings.TODO_SEARCH_LANGUAGE, REGCONFIG), search
+    )
+
+    return (
+        Todo.search_vector.bool_op('@@')(ts_query),
+        cast(func.ts_rank(Todo.search_vector, ts_query), Float),
+    )
+
+
+def match_todos(user_id: int, todo_filter: TodoMatchSchema):
+    """WHERE conditions shared by listings and bulk changes."""
+    conditions = [Todo.user_id == user_id]
+
+    if todo_filter.state:
+        conditions.append(Todo.state == todo_filter.state)
+
+    if todo_filter.search and todo_filter.mode == SearchMode.fulltext:
+        condition, _ = fulltext_todos(todo_filter.search)
+        conditions.append(condition)
+    elif todo_filter.search:
+        conditions.append(search_todos(todo_filter.search))
+
+    return conditions
+
+
+def filter_todos(user_id: int, todo_filter: FilterTodoSchema):
+    """Todos matching the filter, in page order.
+
+    Full-text searches also select their `rank`, which is part of the
+    sort key and therefore of the cursor. A cursor replaces the offset:
+    rows after it are reached through the index instead of being read
+    and skipped.
+    """
+    query = select(Todo).where(*match_todos(user_id, todo_filter))
+
+    if todo_filter.search and todo_filter.mode == SearchMode.fulltext:
+        _, rank = fulltext_todos(todo_filter.search)
+        query = query.add_columns(rank.label('rank'))
+
+        if todo_filter.cursor:
+            after = decode_cursor(todo_filter.cursor, rank=float, id=int)
+            query = query.filter(
+                or_(
+                    rank < after['rank'],
+                    and_(rank == after['rank'], Todo.id > after['id']),
+                )
+            )
+
+        return query.order_by(rank.desc(), Todo.id)
+
+    if todo_filter.cursor:
+        after = decode_cursor(todo_filter.cursor, id=int)
+        query = query.filter(Todo.id > after['id'])
+
+    return query.order_by(Todo.id)
+
+
+def todos_etag(todo_filter: FilterTodoSchema, keys):
+    """ETag of a listing: the filter plus `(id, updated_at)` of each row."""
+    return weak_etag(todo_filter.model_dump_json(), keys)
+
+
+def todo_cursor(row):
+    if 'rank' in row._fields:
+        return encode_cursor(rank=row.rank, id=row.Todo.id)
+
+    return encode_cursor(id=row.Todo.id)
+
+
+todo_listing = Listing(Todo, TodoListSchema, 'todos', todo_cursor)
+
+
 @router.get('/', response_model=TodoListSchema)
-def read_todos(
+async def read_todos(
+    request: Request,
+    session: T_ReadSession,
+    current_user: T_ReadUser,
+    todo_filter: T_Filter,
+):
+    query = filter_todos(current_user.id, todo_filter)
+
+    if not todo_filter.cursor:
+        query = query.offset(todo_filter.offset)
+
+    response, _ = await todo_listing.read(
+        request,
+        session,
+        query,
+        todo_filter.limit,
+        partial(todos_etag, todo_filter),
+    )
+
+    return response
+
+
+EXPORT_FIELDS = list(TodoPublicSchema.model_fields)
+EXPORT_MEDIA_TYPES = {
+    TodoFileFormat.ndjson: 'application/x-ndjson',
+    TodoFileFormat.csv: 'text/csv',
+}
+
+
+def export_lines(todos, export_format: TodoFileFormat):
+    if export_format == TodoFileFormat.ndjson:
+        return ''.join(
+            TodoPublicSchema.model_validate(todo._asdict()).model_dump_json()
+            + '\n'
+            for todo in todos
+        )
+
+    buffer = StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writerows(
+        TodoPublicSchema.model_validate(todo._asdict()).model_dump(mode='json')
+        for todo in todos
+    )
+
+    return buffer.getvalue()
+
+
+async def stream_export(bind, query, export_format: TodoFileFormat):
+    # The request's session is closed before a streamed body is sent,
+    # so the export holds its own session for as long as it streams.
+    async with AsyncSession(bind) as session:
+        result = await session.stream(
+            query.execution_options(yield_per=settings.TODO_EXPORT_BATCH_SIZE)
+        )
+
+        if export_format == TodoFileFormat.csv:
+            yield ','.join(EXPORT_FIELDS) + '\r\n'
+
+        async for todos in result.partitions():
+            yield export_lines(todos, export_format)
+
+
+@router.get('/export')
+async def export_todos(
+    session: T_ReadSession,
+    current_user: T_ReadUser,
+    todo_filter: T_Export,
+):
+    query = (
+        select(*(getattr(Todo, field) for field in EXPORT_FIELDS))
+        .where(*match_todos(current_user.id, todo_filter))
+        .order_by(Todo.id)
+    )
+
+    return StreamingResponse(
+        stream_export(session.bind, query, todo_filter.format),
+        media_type=EXPORT_MEDIA_TYPES[todo_filter.format],
+        headers={
+            'Content-Disposition': (
+                f'attachment; filename="todos.{todo_filter.format.value}"'
+            )
+        },
+    )
+
+
+IMPORT_STAGING = table(
+    'todos_import',
+    column('title'),
+    column('description'),
+    column('state'),
+)
+
+
+INVALID_JSON = object()
+
+
+def read_records(file, file_format: TodoFileFormat):
+    """Yield `(line, record)` pairs, `record` is INVALID_JSON if unparsable."""
+    if file_format == TodoFileFormat.csv:
+        reader = csv.DictReader(file)
+
+        for record in reader:
+            yield reader.line_num, record
+
+        return
+
+    for line, raw in enumerate(file, start=1):
+        if not raw.strip():
+            continue
+
+        try:
+            yield line, json.loads(raw)
+        except ValueError:
+            yield line, INVALID_JSON
+
+
+def validate_records(records):
+    rows, errors = [], []
+
+    for line, record in records:
+        if record is INVALID_JSON:
+            errors.append({'line': line, 'errors': ['Invalid JSON']})
+            continue
+
+        try:
+            todo = TodoSchema.model_validate(record)
+        except ValidationError as error:
+            errors.append({
+                'line': line,
+                'errors': [
+                    f'{".".join(map(str, detail["loc"])) or "record"}: '
+                    f'{detail["msg"]}'
+                    for detail in error.errors()
+                ],
+            })
+            continue
+
+        # COPY rejects NUL characters and would fail the whole import
+        nul_fields = [
+            field
+            for field in ('title', 'description')
+            if '\x00' in getattr(todo, field)
+        ]
+
+        if nul_fields:
+            errors.append({
+                'line': line,
+                'errors': [
+                    f'{field}: NUL characters are not allowed'
+                    for field in nul_fields
+                ],
+            })
+            continue
+
+        rows.append((todo.title, todo.description, todo.state.value))
+
+    return rows, errors
+
+
+async def copy_to_staging(session: AsyncSession, rows):
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+
+    async with raw_connection.driver_connection.cursor() as cursor:
+        async with cursor.copy(
+            'COPY todos_import (title, description, state) FROM STDIN'
+        ) as copy:
+            for row in rows:
+                await copy.write_row(row)
+
+
+async def spool_upload(request: Request):
+    """The request body, spooled to disk and rewound.
+
+    Taken ahead of the session and current user, so a slow upload is
+    read before any pooled connection is checked out. Bodies over
+    TODO_IMPORT_MAX_BYTES are refused with 413.
+    """
+    too_large = HTTPException(
+        status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+        detail='Upload too large',
+    )
+
+    if int(request.headers.get('content-length') or 0) > (
+        settings.TODO_IMPORT_MAX_BYTES
+    ):
+        raise too_large
+
+    with SpooledTemporaryFile(
+        max_size=settings.TODO_IMPORT_SPOOL_BYTES
+    ) as upload:
+        size = 0
+
+        async for chunk in request.stream():
+            size += len(chunk)
+
+            if size > settings.TODO_IMPORT_MAX_BYTES:
+                raise too_large
+
+            upload.write(chunk)
+
+        upload.seek(0)
+
+        yield upload
+
+
+T_Upload = Annotated[SpooledTemporaryFile, Depends(spool_upload)]
+
+
+@router.post(
+    '/import',
+    status_code=HTTPStatus.CREATED,
+    response_model=TodoImportResultSchema,
+)
+async def import_todos(
+    upload: T_Upload,
     session: T_Session,
     current_user: T_CurrentUser,
-    todo_filter: T_Filter,
+    file_format: T_FileFormat = TodoFileFormat.ndjson,
 ):
-    query = select(Todo).where(Todo.user_id == current_user.id)
+    """Bulk load an NDJSON or CSV upload through COPY.
+
+    The spooled body is validated in chunks, copied into a temporary
+    staging table and merged into `todos` with one INSERT ... SELECT,
+    all in a single transaction. Invalid rows are
+    skipped and reported; the first TODO_IMPORT_MAX_ERRORS are listed.
+    """
+    imported, rejected, errors = 0, 0, []
+    file = TextIOWrapper(upload, encoding='utf-8-sig', newline='')
+
+    await session.execute(
+        text(
+            'CREATE TEMPORARY TABLE todos_import ('
+            'title varchar NOT NULL, '
+            'description varchar NOT NULL, '
+            'state todostate NOT NULL'
+            ') ON COMMIT DROP'
+        )
+    )
+
+    try:
+        for records in batched(
+            read_records(file, file_format),
+            settings.TODO_IMPORT_CHUNK_SIZE,
+        ):
+            rows, chunk_errors = validate_records(records)
+            await copy_to_staging(session, rows)
 
-    if todo_filter.search:
-        query = query.filter(
-            or_(
-                Todo.title.ilike(f'%{todo_filter.search}%'),
-                Todo.description.ilike(f'%{todo_filter.search}%'),
+            imported += len(rows)
+            rejected += len(chunk_errors)
+            errors.extend(
+                chunk_errors[: settings.TODO_IMPORT_MAX_ERRORS - len(errors)]
             )
+    except (UnicodeDecodeError, csv.Error):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Could not read the uploaded file',
         )
 
-    if todo_filter.state:
-        query = query.filter(Todo.state == todo_filter.state)
+    await session.execute(
+        insert(Todo).from_select(
+            ['title', 'description', 'state', 'user_id'],
+            select(
+                IMPORT_STAGING.c.title,
+                IMPORT_STAGING.c.description,
+                IMPORT_STAGING.c.state,
+                literal(current_user.id),
+            ),
+        )
+    )
+    await session.commit()
 
-    db_todos = session.scalars(
-        query.offset(todo_filter.offset).limit(todo_filter.limit)
-    ).all()
+    return {'imported': imported, 'rejected': rejected, 'errors': errors}
 
-    return {'todos': db_todos}
+
+def select_todos(user_id: int, selection: TodoSelectionSchema):
+    if selection.ids is not None:
+        return [Todo.user_id == user_id, Todo.id.in_(selection.ids)]
+
+    return match_todos(user_id, selection.filter)
+
+
+@router.patch('/bulk', response_model=TodoBulkResultSchema)
+async def update_todos(
+    todos: TodoBulkUpdateSchema,
+    session: T_Session,
+    current_user: T_CurrentUser,
+):
+    db_ids = await session.scalars(
+        update(Todo)
+        .where(*select_todos(current_user.id, todos))
+        .values(**todos.changes.model_dump(exclude_unset=True))
+        .returning(Todo.id)
+        .execution_options(synchronize_session=False)
+    )
+    db_ids = sorted(db_ids.all())
+
+    await session.commit()
+
+    return {'ids': db_ids, 'count': len(db_ids)}
+
+
+@router.delete('/bulk', response_model=TodoBulkResultSchema)
+async def delete_todos(
+    todos: TodoSelectionSchema,
+    session: T_Session,
+    current_user: T_CurrentUser,
+):
+    db_ids = await session.scalars(
+        delete(Todo)
+        .where(*select_todos(current_user.id, todos))
+        .returning(Todo.id)
+        .execution_options(synchronize_session=False)
+    )
+    db_ids = sorted(db_ids.all())
+
+    await session.commit()
+
+    return {'ids': db_ids, 'count': len(db_ids)}
 
 
 @router.delete('/{todo_id}', response_model=MessageSchema)
-def delete_todo(todo_id: int, session: T_Session, current_user: T_CurrentUser):
-    db_todo = session.scalar(
-        select(Todo).where(Todo.user_id == current_user.id, Todo.id == todo_id)
+async def delete_todo(
+    todo_id: int, session: T_Session, current_user: T_CurrentUser
+):
+    db_todo_id = await session.scalar(
+        delete(Todo)
+        .where(Todo.user_id == current_user.id, Todo.id == todo_id)
+        .returning(Todo.id)
+        .execution_options(synchronize_session=False)
     )
 
-    if not db_todo:
+    if not db_todo_id:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail=f'Task with id {todo_id} not found',
         )
 
-    session.delete(db_todo)
-    session.commit()
+    await session.commit()
 
     return {'message': 'Task has been deleted successfully.'}
 
 
 @router.patch('/{todo_id}', response_model=TodoPublicSchema)
-def update_todo(
+async def update_todo(
     todo_id: int,
     session: T_Session,
     current_user: T_CurrentUser,
     todo: TodoUpdateSchema,
 ):
-    db_todo = session.scalar(
-        select(Todo).where(Todo.user_id == current_user.id, Todo.id == todo_id)
+    db_todo = await session.scalar(
+        update(Todo)
+        .where(Todo.user_id == current_user.id, Todo.id == todo_id)
+        .values(**todo.model_dump(exclude_unset=True))
+        .returning(Todo)
+        .execution_options(synchronize_session=False, populate_existing=True)
     )
 
     if not db_todo:
@@ -105,11 +568,6 @@ def update_todo(
             detail=f'Task with id {todo_id} not found',
         )
 
-    for key, value in todo.model_dump(exclude_unset=True).items():
-        setattr(db_todo, key, value)
-
-    session.add(db_todo)
-    session.commit()
-    session.refresh(db_todo)
+    await session.commit()
 
     return db_todo
@@ -1,13 +1,23 @@
+from functools import partial
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from fast_zero.cache import response_cache, user_cache
 from fast_zero.database import get_session
+from fast_zero.etags import (
+    etag_matches,
+    not_modified,
+    wants_validation,
+    weak_etag,
+)
 from fast_zero.models import User
+from fast_zero.pagination import Listing, decode_cursor, encode_cursor
+from fast_zero.responses import FastJSONResponse
 from fast_zero.schemas import (
     MessageSchema,
     UserListSchema,
@@ -17,19 +27,20 @@ from fast_zero.schemas import (
 from fast_zero.security import (
     get_current_user,
     get_password_hash,
+    user_versions,
 )
 
 router = APIRouter(prefix='/users', tags=['Users'])
 
-T_Session = Annotated[Session, Depends(get_session)]
+T_Session = Annotated[AsyncSession, Depends(get_session)]
 T_CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
 @router.post(
     '/', status_code=HTTPStatus.CREATED, response_model=UserPublicSchema
 )
-def create_user(user: UserSchema, session: T_Session):
-    db_user = session.scalar(
+async def create_user(user: UserSchema, session: T_Session):
+    db_user = await session.scalar(
         select(User).where(
             (User.username == user.username) | (User.email == user.email)
         )
@@ -47,39 +58,133 @@ def create_user(user: UserSchema, session: T_Session):
                 detail=f'Email {user.email} already exists',
             )
 
-    db_user = User(
-        username=user.username,
-        email=user.email,
-        password=get_password_hash(user.password),
+    db_user = await session.scalar(
+        insert(User)
+        .values(
+            username=user.username,
+            email=user.email,
+            password=await get_password_hash(user.password),
+        )
+        .returning(User)
     )
 
-    session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    await session.commit()
+    await response_cache.invalidate('users:tail')
 
     return db_user
 
 
+def cached_response(request: Request, cached):
+    """Answer from a response cache entry, or with 304 if it matches."""
+    body, etag = cached
+
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    return Response(
+        body, media_type='application/json', headers={'ETag': etag}
+    )
+
+
+def page_tags(users, limit: int, offset: int, cursor: str | None):
+    """What a cached page depends on, for precise invalidation.
+
+    Every listed user (look-ahead row included); `users:tail` when no
+    row follows, since only such pages can gain a newly created user;
+    `users:offset` for offset pages, which shift when a user before
+    them is deleted.
+    """
+    tags = {f'user:{user.id}' for user in users}
+
+    if len(users) <= limit:
+        tags.add('users:tail')
+
+    if offset and not cursor:
+        tags.add('users:offset')
+
+    return tags
+
+
+user_listing = Listing(
+    User,
+    UserListSchema,
+    'users',
+    lambda row: encode_cursor(id=row.User.id),
+)
+
+
 @router.get('/', response_model=UserListSchema)
-def read_users(
+async def read_users(
+    request: Request,
     session: T_Session,
     limit: int = 10,
     offset: int = 0,
+    cursor: str | None = None,
 ):
-    users = session.scalars(select(User).limit(limit).offset(offset)).all()
+    """A page of users, served from the response cache when possible.
+
+    Read from the primary, not a replica: a lagging replica would put
+    back a row that a write just invalidated, for every reader, until
+    the entry expires. The primary session only connects on its first
+    query, so a cache hit does not touch the database.
+    """
+    cache_key = f'users:{limit}:{offset}:{cursor}'
 
-    return {'users': users}
+    if cached := await response_cache.get(cache_key):
+        return cached_response(request, cached)
+
+    query = select(User).order_by(User.id)
+
+    if cursor:
+        query = query.where(User.id > decode_cursor(cursor, id=int)['id'])
+    else:
+        query = query.offset(offset)
+
+    response, rows = await user_listing.read(
+        request,
+        session,
+        query,
+        limit,
+        partial(weak_etag, 'users', limit, offset, cursor),
+    )
+
+    if rows is None:
+        return response
+
+    await response_cache.set(
+        cache_key,
+        (response.body.decode(), response.headers['ETag']),
+        page_tags([row.User for row in rows], limit, offset, cursor),
+    )
+
+    return response
 
 
 @router.get(
     '/{user_id}',
     response_model=UserPublicSchema,
 )
-def read_user_by_id(
+async def read_user_by_id(
     user_id: int,
+    request: Request,
     session: T_Session,
 ):
-    db_user = session.scalar(select(User).where(User.id == user_id))
+    """One user, cached and read from the primary like `read_users`."""
+    cache_key = f'user:{user_id}'
+
+    if cached := await response_cache.get(cache_key):
+        return cached_response(request, cached)
+
+    if wants_validation(request):
+        updated_at = await session.scalar(
+            select(User.updated_at).where(User.id == user_id)
+        )
+        etag = weak_etag('user', user_id, updated_at)
+
+        if updated_at and etag_matches(request, etag):
+            return not_modified(etag)
+
+    db_user = await session.scalar(select(User).where(User.id == user_id))
 
     if not db_user:
         raise HTTPException(
@@ -87,14 +192,24 @@ def read_user_by_id(
             detail=f'User with id {user_id} not found',
         )
 
-    return db_user
+    response = FastJSONResponse(
+        UserPublicSchema.model_validate(db_user),
+        headers={'ETag': weak_etag('user', user_id, db_user.updated_at)},
+    )
+    await response_cache.set(
+        cache_key,
+        (response.body.decode(), response.headers['ETag']),
+        {f'user:{user_id}'},
+    )
+
+    return response
 
 
 @router.put(
     '/{user_id}',
     response_model=UserPublicSchema,
 )
-def update_user(
+async def update_user(
     user_id: int,
     user: UserSchema,
     session: T_Session,
@@ -107,14 +222,27 @@ def update_user(
         )
 
     try:
-        current_user.username = user.username
-        current_user.email = user.email
-        current_user.password = get_password_hash(user.password)
+        db_user = await session.scalar(
+            update(User)
+            .where(User.id == user_id)
+            .values(
+                username=user.username,
+                email=user.email,
+                password=await get_password_hash(user.password),
+                version=User.version + 1,
+            )
+            .returning(User)
+            .execution_options(
+                synchronize_session=False, populate_existing=True
+            )
+        )
 
-        session.commit()
-        session.refresh(current_user)
+        await session.commit()
+        user_cache.invalidate(current_user.email)
+        user_versions.revoke(user_id, below=db_user.version)
+        await response_cache.invalidate(f'user:{user_id}')
 
-        return current_user
+        return db_user
 
     except IntegrityError:
         raise HTTPException(
@@ -124,7 +252,7 @@ def update_user(
 
 
 @router.delete('/{user_id}', response_model=MessageSchema)
-def delete_user(
+async def delete_user(
     user_id: int,
     session: T_Session,
     current_user: T_CurrentUser,
@@ -135,7 +263,14 @@ def delete_user(
             detail='Not enough permissions',
         )
 
-    session.delete(current_user)
-    session.commit()
+    await session.execute(
+        delete(User)
+        .where(User.id == user_id)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    user_cache.invalidate(current_user.email)
+    user_versions.revoke(user_id, below=float('inf'))
+    await response_cache.invalidate(f'user:{user_id}', 'users:offset')
 
     return {'message': 'User deleted'}
@@ -1,8 +1,10 @@
 from datetime import datetime
+from enum import Enum
 
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, model_validator
 
 from fast_zero.models import TodoState
+from fast_zero.settings import settings
 
 
 class MessageSchema(BaseModel):
@@ -27,6 +29,7 @@ class UserPublicSchema(BaseModel):
 
 class UserListSchema(BaseModel):
     users: list[UserPublicSchema]
+    next_cursor: str | None = None
 
 
 class TokenSchema(BaseModel):
@@ -40,6 +43,12 @@ class TodoSchema(BaseModel):
     state: TodoState
 
 
+class TodoBulkSchema(BaseModel):
+    todos: list[TodoSchema] = Field(
+        min_length=1, max_length=settings.TODO_BULK_MAX_ITEMS
+    )
+
+
 class TodoPublicSchema(TodoSchema):
     id: int
     created_at: datetime
@@ -48,19 +57,146 @@ class TodoPublicSchema(TodoSchema):
 
 class TodoListSchema(BaseModel):
     todos: list[TodoPublicSchema]
+    next_cursor: str | None = None
 
 
 class FilterPage(BaseModel):
     offset: int = 0
     limit: int = 10
+    cursor: str | None = None
+
+
+class SearchMode(str, Enum):
+    substring = 'substring'
+    fulltext = 'fulltext'
+
 
+class TodoFileFormat(str, Enum):
+    ndjson = 'ndjson'
+    csv = 'csv'
 
-class FilterTodoSchema(FilterPage):
+
+class TodoMatchSchema(BaseModel):
     search: str | None = None
+    mode: SearchMode = SearchMode.substring
     state: TodoState = TodoState.draft
 
 
+class FilterTodoSchema(FilterPage, TodoMatchSchema):
+    pass
+
+
+class TodoExportSchema(TodoMatchSchema):
+    format: TodoFileFormat = TodoFileFormat.ndjson
+
+
 class TodoUpdateSchema(BaseModel):
     title: str | None = None
     description: str | None = None
     state: TodoState | None = None
+
+
+class HealthSchema(BaseModel):
+    status: str
+    attempts: int | None = None
+    warmup_seconds: float | None = None
+    last_error: str | None = None
+
+
+class CacheStatsSchema(BaseModel):
+    size: int
+    max_size: int
+    ttl: float
+    hits: int
+    misses: int
+    evictions: int
+    hit_rate: float
+    time_saved: float
+
+
+class ResponseCacheStatsSchema(BaseModel):
+    backend: str
+    size: int | None
+    hits: int
+    misses: int
+    hit_rate: float
+    invalidations: int
+
+
+class HashPoolStatsSchema(BaseModel):
+    workers: int
+    queue_size: int
+    queued: int
+    in_flight: int
+    completed: int
+    rejected: int
+    restarts: int
+    wait_count: int
+    wait_time_avg: float
+    wait_time_max: float
+
+
+class PoolStatusSchema(BaseModel):
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+    max_overflow: int
+    connects: int
+    checkouts: int
+    checkins: int
+    invalidations: int
+    timeouts: int
+    wait_count: int
+    wait_time_avg: float
+    wait_time_max: float
+    hold_time_max: float
+
+
+class TodoSelectionFilterSchema(TodoMatchSchema):
+    state: TodoState | None = Field(
+        None,
+        description='Matches todos in every state when omitted, '
+        'unlike the listing filter, which defaults to drafts.',
+    )
+
+
+class TodoSelectionSchema(BaseModel):
+    ids: list[int] | None = Field(
+        None, max_length=settings.TODO_BULK_MAX_ITEMS
+    )
+    filter: TodoSelectionFilterSchema | None = None
+
+    @model_validator(mode='after')
+    def check_ids_or_filter(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError('Provide either ids or filter')
+
+        return self
+
+
+class TodoBulkUpdateSchema(TodoSelectionSchema):
+    changes: TodoUpdateSchema
+
+    @model_validator(mode='after')
+    def check_changes(self):
+        if not self.changes.model_fields_set:
+            raise ValueError('Provide at least one change')
+
+        return self
+
+
+class TodoBulkResultSchema(BaseModel):
+    ids: list[int]
+    count: int
+
+
+class TodoImportErrorSchema(BaseModel):
+    line: int
+    errors: list[str]
+
+
+class TodoImportResultSchema(BaseModel):
+    imported: int
+    rejected: int
+    errors: list[TodoImportErrorSchema]
@@ -1,28 +1,52 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from hashlib import sha256
 from http import HTTPStatus
+from time import perf_counter, time
 
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jwt import ExpiredSignatureError, PyJWTError, decode, encode
-from pwdlib import PasswordHash
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import object_session
 from zoneinfo import ZoneInfo
 
-from fast_zero.database import get_session
+from fast_zero.cache import token_cache, user_cache
+from fast_zero.database import (
+    get_read_session,
+    get_session,
+    scalar_or_primary,
+)
+from fast_zero.hashing import (
+    HashPoolBusy,
+    check_and_update_password,
+    hash_password,
+    hash_pool,
+)
 from fast_zero.models import User
 from fast_zero.settings import settings
 
-pwd_context = PasswordHash.recommended()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='auth/token')
 
 
-def get_password_hash(password: str):
-    return pwd_context.hash(password)
+async def run_hash(function, *args):
+    try:
+        return await hash_pool.run(function, *args)
+    except HashPoolBusy:
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail='Too many password checks in progress',
+            headers={'Retry-After': '1'},
+        )
+
+
+async def get_password_hash(password: str):
+    return await run_hash(hash_password, password)
 
 
-def verify_password(password: str, hashed_password: str):
-    return pwd_context.verify(password, hashed_password)
+async def verify_and_update_password(password: str, hashed_password: str):
+    return await run_hash(check_and_update_password, password, hashed_password)
 
 
 def create_access_token(data: dict):
@@ -40,32 +64,153 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 
-def get_current_user(
-    session: Session = Depends(get_session),
-    token: str = Depends(oauth2_scheme),
-):
-    credentials_exception = HTTPException(
+def credentials_exception():
+    return HTTPException(
         status_code=HTTPStatus.UNAUTHORIZED,
         detail='Could not validate credentials',
         headers={'WWW-Authenticate': 'Bearer'},
     )
 
+
+def user_claims(user):
+    return {'sub': user.email, 'uid': user.id, 'ver': user.version}
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Token user built from the JWT claims, without a database hit."""
+
+    id: int
+    email: str
+    version: int
+
+
+class UserVersions:
+    """Lowest token version each user still accepts, in this process.
+
+    Fed by update_user and delete_user. Other workers keep accepting
+    older stateless tokens until those expire.
+    """
+
+    def __init__(self):
+        self._versions = {}
+
+    def revoke(self, user_id: int, below: float):
+        self._versions[user_id] = max(below, self._versions.get(user_id, 0))
+
+    def is_revoked(self, user_id: int, version: int):
+        return version < self._versions.get(user_id, 0)
+
+    def clear(self):
+        self._versions.clear()
+
+
+user_versions = UserVersions()
+
+
+def decode_token(token: str):
     try:
         payload = decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            token,
+            settings.SECRET_KEY,
+            algorithms=[settings.ALGORITHM],
+            options={'require': ['exp']},
         )
-        email: str = payload.get('sub')
 
-        if not email:
-            raise credentials_exception
+        if not payload.get('sub'):
+            raise credentials_exception()
     except ExpiredSignatureError:
-        raise credentials_exception
+        raise credentials_exception()
     except PyJWTError:
-        raise credentials_exception
+        raise credentials_exception()
+
+    return payload
+
+
+def get_token_claims(token: str):
+    """Decode a token once, then serve its claims from `token_cache`.
+
+    Entries live until the token's `exp`, so the signature is checked
+    once per token and process rather than once per request.
+    """
+    digest = sha256(token.encode()).digest()
+    claims = token_cache.get(digest)
 
-    db_user = session.scalar(select(User).where(User.email == email))
+    if claims is None:
+        start = perf_counter()
+        claims = decode_token(token)
+        token_cache.record_load(perf_counter() - start)
+        token_cache.set(digest, claims, ttl=claims['exp'] - time())
+    elif claims['exp'] <= time():
+        token_cache.invalidate(digest)
+        raise credentials_exception()
 
-    if not db_user:
-        raise credentials_exception
+    return claims
+
+
+async def load_user(session: AsyncSession, email: str, fetch):
+    """Return the user for a token subject, going through `user_cache`.
+
+    Cached users are detached from any session, so handlers may read
+    their attributes but must not write through them.
+    """
+    db_user = user_cache.get(email)
+
+    if db_user is None:
+        start = perf_counter()
+        db_user = await fetch(session, select(User).where(User.email == email))
+        user_cache.record_load(perf_counter() - start)
+
+        if not db_user:
+            raise credentials_exception()
+
+        if owner := object_session(db_user):
+            owner.expunge(db_user)
+
+        user_cache.set(email, db_user)
 
     return db_user
+
+
+async def authenticate(session: AsyncSession, token: str, fetch):
+    """Resolve the token user.
+
+    With AUTH_STATELESS, tokens carrying `uid` and `ver` resolve to a
+    `Principal` straight from the claims. Otherwise, and for older
+    tokens, the user row is loaded and tokens older than its version
+    are rejected.
+    """
+    claims = get_token_claims(token)
+    user_id, version = claims.get('uid'), claims.get('ver')
+
+    if user_id is not None and version is not None:
+        if user_versions.is_revoked(user_id, version):
+            raise credentials_exception()
+
+        if settings.AUTH_STATELESS:
+            return Principal(id=user_id, email=claims['sub'], version=version)
+
+    db_user = await load_user(session, claims['sub'], fetch)
+
+    if version is not None and version < db_user.version:
+        raise credentials_exception()
+
+    return db_user
+
+
+async def get_current_user(
+    session: AsyncSession = Depends(get_session),
+    token: str = Depends(oauth2_scheme),
+):
+    return await authenticate(session, token, AsyncSession.scalar)
+
+
+async def get_current_user_read_only(
+    session: AsyncSession = Depends(get_read_session),
+    token: str = Depends(oauth2_scheme),
+):
+    """Same as `get_current_user`, but looked up on a read replica.
+
+    Only for handlers that do not write through the returned user.
+    """
+    return await authenticate(session, token, scalar_or_primary)
@@ -0,0 +1,63 @@
+"""Production server, `python -m fast_zero.serve`.
+
+Workers are spawned processes that import `fast_zero.app` themselves,
+so each one creates its own engine and connection pool; the supervisor
+never imports the app. Workers that exit after their max requests are
+replaced by the supervisor.
+"""
+
+import random
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from fast_zero.settings import settings
+
+
+class WorkerConfig(uvicorn.Config):
+    """Config whose max requests get a random jitter in each worker.
+
+    `load` runs inside every worker, respawned ones included, so workers
+    recycle at different points instead of all at once.
+    """
+
+    def __init__(self, *args, max_requests_jitter: int = 0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_requests_jitter = max_requests_jitter
+
+    def load(self):
+        if self.limit_max_requests and self.max_requests_jitter:
+            self.limit_max_requests += random.randint(
+                0, self.max_requests_jitter
+            )
+
+        super().load()
+
+
+def build_config():
+    return WorkerConfig(
+        'fast_zero.app:app',
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=settings.SERVER_WORKERS,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT,
+        limit_max_requests=settings.SERVER_MAX_REQUESTS or None,
+        max_requests_jitter=settings.SERVER_MAX_REQUESTS_JITTER,
+        forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+    )
+
+
+def main():  # pragma: no cover
+    config = build_config()
+    server = uvicorn.Server(config)
+
+    # Supervised even with a single worker, so recycling restarts it
+    Multiprocess(
+        config, target=server.run, sockets=[config.bind_socket()]
+    ).run()
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -1,3 +1,7 @@
+import os
+from typing import Literal
+
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -11,5 +15,71 @@ class Settings(BaseSettings):
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30
+    DATABASE_POOL_RECYCLE: int = -1
+    DATABASE_POOL_PRE_PING: bool = False
+    DATABASE_POOL_USE_LIFO: bool = False
+
+    DATABASE_REPLICA_URLS: list[str] = []
+    DATABASE_REPLICA_RETRY_SECONDS: float = 30
+    DATABASE_READ_YOUR_WRITES_SECONDS: float = 5
+
+    TODO_SEARCH_LANGUAGE: str = Field('english', pattern=r'^[a-z_]+$')
+    TODO_BULK_MAX_ITEMS: int = 500
+    TODO_EXPORT_BATCH_SIZE: int = 1000
+    TODO_IMPORT_CHUNK_SIZE: int = 5000
+    TODO_IMPORT_MAX_ERRORS: int = 100
+    TODO_IMPORT_SPOOL_BYTES: int = 8 * 1024 * 1024
+    TODO_IMPORT_MAX_BYTES: int = 256 * 1024 * 1024
+
+    AUTH_STATELESS: bool = False
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+    PASSWORD_HASH_TIME_COST: int = 3
+    PASSWORD_HASH_MEMORY_COST: int = 65536
+    PASSWORD_HASH_PARALLELISM: int = 4
+
+    REDIS_URL: str | None = None
+
+    # With the memory backend every worker keeps its own buckets, so a
+    # client gets up to SERVER_WORKERS times these limits. The shared
+    # backend keeps them in REDIS_URL, one set for all workers.
+    LOGIN_RATE_LIMIT_BACKEND: Literal['memory', 'shared'] = 'memory'
+    LOGIN_IP_BURST: int = 20
+    LOGIN_IP_PER_MINUTE: float = 20
+    LOGIN_ACCOUNT_BURST: int = 5
+    LOGIN_ACCOUNT_PER_MINUTE: float = 5
+    LOGIN_MAX_IN_FLIGHT: int = 32
+    LOGIN_RATE_LIMIT_KEYS: int = 100_000
+    LOGIN_CLIENT_IP_HEADER: str | None = None
+    USER_CACHE_SIZE: int = 1024
+    USER_CACHE_TTL_SECONDS: float = 30
+    TOKEN_CACHE_SIZE: int = 4096
+    RESPONSE_CACHE_BACKEND: Literal['memory', 'shared'] = 'memory'
+    RESPONSE_CACHE_SIZE: int = 1024
+    RESPONSE_CACHE_TTL_SECONDS: float = 60
+
+    COMPRESSION_ENCODINGS: list[str] = ['br', 'gzip']
+    COMPRESSION_MINIMUM_SIZE: int = 500
+    COMPRESSION_GZIP_LEVEL: int = Field(6, ge=1, le=9)
+    COMPRESSION_BROTLI_QUALITY: int = Field(4, ge=0, le=11)
+
+    SERVER_HOST: str = '0.0.0.0'
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = Field(default_factory=lambda: os.cpu_count() or 1)
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEP_ALIVE: int = 5
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    SERVER_MAX_REQUESTS: int = 10_000
+    SERVER_MAX_REQUESTS_JITTER: int = 1_000
+    SERVER_FORWARDED_ALLOW_IPS: str = '127.0.0.1'
+
+    INTERNAL_TOKEN: str | None = None
+
+    WARMUP_CONNECTIONS: int = 2
+    WARMUP_RETRY_SECONDS: float = 2
+
 
 settings = Settings()  # type: ignore
@@ -0,0 +1,18 @@
+from functools import cache
+
+from fast_zero.settings import settings
+
+
+@cache
+def shared_client():
+    """Async Redis client for state shared by every worker.
+
+    Imported and created on first use, it only connects on the first
+    command. Needs REDIS_URL.
+    """
+    from redis.asyncio import Redis  # noqa: PLC0415
+
+    if not settings.REDIS_URL:
+        raise RuntimeError('REDIS_URL is required for shared backends')
+
+    return Redis.from_url(settings.REDIS_URL)
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from time import perf_counter
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from fast_zero.hashing import hash_password, hash_pool
+from fast_zero.models import User
+from fast_zero.routers.todos import filter_todos
+from fast_zero.schemas import FilterTodoSchema
+from fast_zero.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class WarmUpState:
+    """Whether this process finished warming up, for `/health/ready`."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.ready = False
+        self.seconds = None
+        self.attempts = 0
+        self.last_error = None
+
+
+warmup_state = WarmUpState()
+
+
+def hot_statements():
+    """The statements behind the busiest routes, in their request shape.
+
+    Executing them once fills the engine's compiled statement cache and
+    configures the mappers, so the first real requests skip both.
+    """
+    return [
+        select(User).where(User.email == 'warm-up'),
+        select(User).where(User.id == 0),
+        select(User).order_by(User.id).offset(0).limit(11),
+        filter_todos(0, FilterTodoSchema()).offset(0).limit(11),
+    ]
+
+
+async def open_connections(engine: AsyncEngine, count: int):
+    """Open `count` pool connections at once, leaving them idle in the pool."""
+    connections = []
+
+    try:
+        for _ in range(count):
+            connection = await engine.connect()
+            connections.append(connection)
+            await connection.execute(text('SELECT 1'))
+    finally:
+        for connection in connections:
+            await connection.close()
+
+
+async def warm_database(engine: AsyncEngine):
+    await open_connections(engine, settings.WARMUP_CONNECTIONS)
+
+    async with AsyncSession(engine) as session:
+        for statement in hot_statements():
+            await session.execute(statement)
+
+
+async def warm_hasher():
+    # One hash per worker, so every process is started with argon2 loaded
+    await asyncio.gather(
+        *(
+            hash_pool.run(hash_password, 'warm-up')
+            for _ in range(max(hash_pool.workers, 1))
+        )
+    )
+
+
+async def warm_up(engine: AsyncEngine, state: WarmUpState = warmup_state):
+    """Warm the pool, statement cache and hasher, then mark `state` ready.
+
+    A failed attempt is logged, kept in `state.last_error` for the
+    readiness probe and retried every WARMUP_RETRY_SECONDS; the
+    instance stays not ready until one succeeds.
+    """
+    start = perf_counter()
+
+    while True:
+        state.attempts += 1
+
+        try:
+            await warm_database(engine)
+            await warm_hasher()
+            break
+        except Exception as error:
+            state.last_error = repr(error)
+            logger.warning(
+                'Warm-up attempt %d failed', state.attempts, exc_info=True
+            )
+            await asyncio.sleep(settings.WARMUP_RETRY_SECONDS)
+
+    state.seconds = perf_counter() - start
+    state.ready = True
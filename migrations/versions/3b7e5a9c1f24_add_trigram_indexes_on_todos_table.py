@@ -0,0 +1,56 @@
+"""add trigram indexes on todos table
+
+Revision ID: 3b7e5a9c1f24
+Revises: 8f2c1d4e7a90
+Create Date: 2026-10-18 10:03:17.284551
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e5a9c1f24'
+down_revision: Union[str, None] = '8f2c1d4e7a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_todos_title_trgm',
+            'todos',
+            ['title'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_todos_description_trgm',
+            'todos',
+            ['description'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'description': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_todos_description_trgm',
+            table_name='todos',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_todos_title_trgm',
+            table_name='todos',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,31 @@
+"""add version on users table
+
+Revision ID: 5e1a7c3d9b62
+Revises: c4d9e2b6a851
+Create Date: 2026-10-18 14:05:12.804117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1a7c3d9b62'
+down_revision: Union[str, None] = 'c4d9e2b6a851'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column(
+            'version', sa.Integer(), server_default='1', nullable=False
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'version')
@@ -0,0 +1,50 @@
+"""add user_id indexes on todos table
+
+Revision ID: 8f2c1d4e7a90
+Revises: 973332b92205
+Create Date: 2026-10-18 09:12:41.513207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f2c1d4e7a90'
+down_revision: Union[str, None] = '973332b92205'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_todos_user_id_state_id',
+            'todos',
+            ['user_id', 'state', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_todos_user_id_id',
+            'todos',
+            ['user_id', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_todos_user_id_id',
+            table_name='todos',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_todos_user_id_state_id',
+            table_name='todos',
+            postgresql_concurrently=True,
+        )
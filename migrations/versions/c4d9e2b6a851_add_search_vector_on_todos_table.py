@@ -0,0 +1,59 @@
+"""add search_vector on todos table
+
+Revision ID: c4d9e2b6a851
+Revises: 3b7e5a9c1f24
+Create Date: 2026-10-18 11:26:54.907132
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from fast_zero.settings import Settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d9e2b6a851'
+down_revision: Union[str, None] = '3b7e5a9c1f24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A stored generated column rewrites the table once; changing
+    # TODO_SEARCH_LANGUAGE later needs the column to be regenerated.
+    language = Settings().TODO_SEARCH_LANGUAGE  # type: ignore
+    op.add_column('todos', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            f"setweight(to_tsvector('{language}', title), 'A') || "
+            f"setweight(to_tsvector('{language}', description), 'B')",
+            persisted=True,
+        ),
+        nullable=False,
+    ))
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_todos_search_vector',
+            'todos',
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_todos_search_vector',
+            table_name='todos',
+            postgresql_concurrently=True,
+        )
+
+    op.drop_column('todos', 'search_vector')
@@ -1,15 +1,23 @@
+from contextlib import contextmanager
+
 import factory
 import factory.fuzzy
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from testcontainers.postgres import PostgresContainer
 
 from fast_zero.app import app
-from fast_zero.database import get_session
+from fast_zero.cache import response_cache, token_cache, user_cache
+from fast_zero.database import get_read_session, get_session
+from fast_zero.hashing import hash_pool
 from fast_zero.models import Todo, TodoState, User, table_registry
-from fast_zero.security import get_password_hash
+from fast_zero.ratelimit import login_limiter
+from fast_zero.security import get_password_hash, user_versions
+from fast_zero.settings import settings
+from fast_zero.warmup import warmup_state
 
 
 class UserFactory(factory.Factory):
@@ -31,13 +39,35 @@ class TodoFactory(factory.Factory):
     user_id = 1
 
 
+@pytest_asyncio.fixture(autouse=True)
+async def clear_caches():
+    yield
+
+    user_cache.clear()
+    token_cache.clear()
+    await response_cache.clear()
+    await login_limiter.backend.clear()
+    user_versions.clear()
+    warmup_state.reset()
+
+
 @pytest.fixture
-def client(session):
+def client(session, monkeypatch):
     def get_session_override():
         return session
 
+    async def skip_warm_up(engine):
+        pass
+
+    # The lifespan would warm up the engine from settings.DATABASE_URL,
+    # not the test database, and shut the shared hash pool down after
+    # every test. The health tests warm up the test engine directly.
+    monkeypatch.setattr('fast_zero.app.warm_up', skip_warm_up)
+    monkeypatch.setattr(hash_pool, 'shutdown', lambda: None)
+
     with TestClient(app) as client:
         app.dependency_overrides[get_session] = get_session_override
+        app.dependency_overrides[get_read_session] = get_session_override
 
         yield client
 
@@ -47,44 +77,73 @@ def client(session):
 @pytest.fixture(scope='session')
 def engine():
     with PostgresContainer('postgres:16', driver='psycopg') as postgres:
-        _engine = create_engine(postgres.get_connection_url())
+        _engine = create_async_engine(postgres.get_connection_url())
 
-        with _engine.begin():
-            yield _engine
+        yield _engine
 
 
-@pytest.fixture
-def session(engine):
-    table_registry.metadata.create_all(engine)
+@pytest_asyncio.fixture
+async def session(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.create_all)
 
-    with Session(engine) as session:
+    async with AsyncSession(engine, expire_on_commit=False) as session:
         yield session
 
-    table_registry.metadata.drop_all(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.drop_all)
+
+
+@pytest.fixture
+def statements(engine):
+    @contextmanager
+    def collect():
+        executed = []
+
+        def on_execute(conn, cursor, statement, *args):
+            executed.append(statement)
+
+        event.listen(engine.sync_engine, 'before_cursor_execute', on_execute)
+
+        try:
+            yield executed
+        finally:
+            event.remove(
+                engine.sync_engine, 'before_cursor_execute', on_execute
+            )
+
+    return collect
 
 
 @pytest.fixture
-def user(session):
+def internal_headers(monkeypatch):
+    monkeypatch.setattr(settings, 'INTERNAL_TOKEN', 'internal-secret')
+
+    return {'X-Internal-Token': 'internal-secret'}
+
+
+@pytest_asyncio.fixture
+async def user(session):
     pwd = 'password'
 
-    user = UserFactory(password=get_password_hash(pwd))
+    user = UserFactory(password=await get_password_hash(pwd))
 
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    await session.refresh(user)
 
     user.clean_password = pwd  # type: ignore
 
     return user
 
 
-@pytest.fixture
-def other_user(session):
+@pytest_asyncio.fixture
+async def other_user(session):
     user = UserFactory()
 
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    await session.refresh(user)
 
     return user
 
@@ -1,8 +1,72 @@
 from http import HTTPStatus
 
+import pytest
+
+from fast_zero.settings import settings
+from tests.conftest import TodoFactory, UserFactory
+
 
 def test_read_root_should_return_OK_and_hello_world(client):
     response = client.get('/')
 
     assert response.status_code == HTTPStatus.OK
     assert response.json() == {'message': 'Hello World!'}
+
+
+@pytest.mark.asyncio
+async def test_app_should_gzip_large_bodies_only(session, client, user):
+    expected_users = 20
+    session.add_all(UserFactory.create_batch(expected_users - 1))
+    await session.commit()
+
+    large = client.get('/users/?limit=20', headers={'Accept-Encoding': 'gzip'})
+    small = client.get('/', headers={'Accept-Encoding': 'gzip'})
+    identity = client.get(
+        '/users/?limit=20', headers={'Accept-Encoding': 'identity'}
+    )
+
+    assert large.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in large.headers['Vary']
+    assert len(large.json()['users']) == expected_users
+    assert 'Content-Encoding' not in small.headers
+    assert 'Content-Encoding' not in identity.headers
+
+
+@pytest.mark.asyncio
+async def test_app_should_compress_streamed_exports(
+    session, client, user, token, monkeypatch
+):
+    monkeypatch.setattr(settings, 'COMPRESSION_MINIMUM_SIZE', 10**6)
+    expected_todos = 5
+    session.add_all(TodoFactory.create_batch(expected_todos, user_id=user.id))
+    await session.commit()
+
+    response = client.get(
+        '/todos/export',
+        headers={
+            'Authorization': f'Bearer {token}',
+            'Accept-Encoding': 'gzip',
+        },
+    )
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert len(response.text.splitlines()) == expected_todos
+
+
+def test_app_should_prefer_brotli(client):
+    response = client.get(
+        '/openapi.json', headers={'Accept-Encoding': 'gzip, br'}
+    )
+
+    assert response.headers['Content-Encoding'] == 'br'
+    assert response.json()['openapi']
+
+
+def test_app_should_not_let_a_wildcard_override_a_refusal(client):
+    response = client.get(
+        '/openapi.json', headers={'Accept-Encoding': 'br;q=0, gzip;Q=0, *'}
+    )
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.json()['openapi']
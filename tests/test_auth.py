@@ -1,7 +1,12 @@
 from http import HTTPStatus
 
+import pytest
 from freezegun import freeze_time
 
+from fast_zero.hashing import build_context, hash_pool, pwd_context
+from fast_zero.settings import settings
+from tests.conftest import UserFactory
+
 
 def test_login_should_return_OK_and_token(client, user):
     response = client.post(
@@ -105,3 +110,110 @@ def test_token_should_not_refreah_token_if_time_is_expired(client, user):
 
         assert response.status_code == HTTPStatus.UNAUTHORIZED
         assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+@pytest.mark.asyncio
+async def test_login_should_rehash_password_with_current_parameters(
+    session, client
+):
+    legacy = build_context(time_cost=1, memory_cost=1024, parallelism=1)
+    user = UserFactory(password=legacy.hash('secret'))
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    updated_at = user.updated_at
+
+    response = client.post(
+        '/auth/token', data={'username': user.email, 'password': 'secret'}
+    )
+    await session.refresh(user)
+
+    assert response.status_code == HTTPStatus.OK
+    assert not pwd_context().current_hasher.check_needs_rehash(user.password)
+    assert pwd_context().verify('secret', user.password)
+    assert user.updated_at == updated_at
+
+
+def test_login_should_return_TOO_MANY_REQUESTS_before_hashing(
+    client, user, monkeypatch
+):
+    monkeypatch.setattr(settings, 'LOGIN_ACCOUNT_BURST', 2)
+    before = hash_pool.stats()['completed']
+    form = {'username': user.email, 'password': 'wrong'}
+
+    responses = [client.post('/auth/token', data=form) for _ in range(3)]
+
+    assert [response.status_code for response in responses] == [
+        HTTPStatus.UNAUTHORIZED,
+        HTTPStatus.UNAUTHORIZED,
+        HTTPStatus.TOO_MANY_REQUESTS,
+    ]
+    assert int(responses[-1].headers['Retry-After']) >= 1
+    assert hash_pool.stats()['completed'] - before == len(responses) - 1
+
+
+def test_login_should_limit_attempts_per_client_ip(client, monkeypatch):
+    monkeypatch.setattr(settings, 'LOGIN_IP_BURST', 1)
+
+    first = client.post(
+        '/auth/token', data={'username': 'a@test.com', 'password': 'x'}
+    )
+    second = client.post(
+        '/auth/token', data={'username': 'b@test.com', 'password': 'x'}
+    )
+
+    assert first.status_code == HTTPStatus.NOT_FOUND
+    assert second.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+
+def test_login_should_limit_each_forwarded_client_ip_apart(
+    client, monkeypatch
+):
+    monkeypatch.setattr(settings, 'LOGIN_IP_BURST', 1)
+    monkeypatch.setattr(settings, 'LOGIN_CLIENT_IP_HEADER', 'Fly-Client-IP')
+
+    responses = [
+        client.post(
+            '/auth/token',
+            data={'username': f'{number}@test.com', 'password': 'x'},
+            headers={'Fly-Client-IP': ip},
+        )
+        for number, ip in enumerate(['203.0.113.1', '203.0.113.2'] * 2)
+    ]
+
+    assert [response.status_code for response in responses] == [
+        HTTPStatus.NOT_FOUND,
+        HTTPStatus.NOT_FOUND,
+        HTTPStatus.TOO_MANY_REQUESTS,
+        HTTPStatus.TOO_MANY_REQUESTS,
+    ]
+
+
+def test_login_should_key_on_the_address_the_proxy_appended(
+    client, monkeypatch
+):
+    monkeypatch.setattr(settings, 'LOGIN_IP_BURST', 1)
+    monkeypatch.setattr(settings, 'LOGIN_CLIENT_IP_HEADER', 'X-Forwarded-For')
+
+    responses = [
+        client.post(
+            '/auth/token',
+            data={'username': f'{spoofed}@test.com', 'password': 'x'},
+            headers={'X-Forwarded-For': f'{spoofed}, 203.0.113.1'},
+        )
+        for spoofed in ['198.51.100.1', '198.51.100.2']
+    ]
+
+    assert responses[1].status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+
+def test_login_should_cap_verifications_in_flight(client, user, monkeypatch):
+    monkeypatch.setattr(settings, 'LOGIN_MAX_IN_FLIGHT', 0)
+
+    response = client.post(
+        '/auth/token',
+        data={'username': user.email, 'password': user.clean_password},
+    )
+
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert response.headers['Retry-After'] == '1'
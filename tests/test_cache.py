@@ -0,0 +1,99 @@
+import fnmatch
+
+import pytest
+
+from fast_zero.cache import (
+    MemoryResponseBackend,
+    ResponseCache,
+    SharedResponseBackend,
+    build_response_backend,
+)
+from fast_zero.settings import settings
+from fast_zero.store import shared_client
+
+
+class FakeSharedClient:
+    """The slice of an async Redis client the shared backend uses.
+
+    Set members come back as bytes, as from a client without
+    `decode_responses`.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+        self.expiries = {}
+
+    async def get(self, name):
+        return self.values.get(name)
+
+    async def set(self, name, value, ex=None):
+        self.values[name] = value
+
+    async def sadd(self, name, *values):
+        self.sets.setdefault(name, set()).update(
+            value.encode() for value in values
+        )
+
+    async def expire(self, name, seconds):
+        self.expiries[name] = seconds
+
+    async def smembers(self, name):
+        return self.sets.get(name, set())
+
+    async def delete(self, *names):
+        for name in names:
+            self.values.pop(name, None)
+            self.sets.pop(name, None)
+
+    async def scan_iter(self, match):
+        for name in [*self.values, *self.sets]:
+            if fnmatch.fnmatch(name, match):
+                yield name
+
+
+@pytest.mark.asyncio
+async def test_shared_backend_should_invalidate_entries_by_tag():
+    cache = ResponseCache(SharedResponseBackend(FakeSharedClient(), ttl=60))
+
+    await cache.set('user:1', ('{"id":1}', 'W/"a"'), {'user:1'})
+    await cache.set('users:10:0:None', ('[]', 'W/"b"'), {'user:1', 'user:2'})
+    await cache.set('user:2', ('{"id":2}', 'W/"c"'), {'user:2'})
+    await cache.invalidate('user:1')
+
+    assert await cache.get('user:1') is None
+    assert await cache.get('users:10:0:None') is None
+    assert await cache.get('user:2') == ('{"id":2}', 'W/"c"')
+    assert cache.stats()['hits'] == 1
+
+    await cache.clear()
+
+    assert await cache.get('user:2') is None
+
+
+@pytest.mark.asyncio
+async def test_shared_backend_should_expire_tag_sets_with_their_entries():
+    client = FakeSharedClient()
+    cache = ResponseCache(SharedResponseBackend(client, ttl=60))
+
+    await cache.set('user:1', ('{"id":1}', 'W/"a"'), {'user:1', 'users:tail'})
+
+    assert client.expiries == {
+        'fast_zero:tag:user:1': 60,
+        'fast_zero:tag:users:tail': 60,
+    }
+
+
+def test_build_response_backend_should_follow_the_setting(monkeypatch):
+    monkeypatch.setattr(settings, 'REDIS_URL', 'redis://localhost:6379/0')
+    shared_client.cache_clear()
+
+    monkeypatch.setattr(settings, 'RESPONSE_CACHE_BACKEND', 'memory')
+    memory = build_response_backend()
+    monkeypatch.setattr(settings, 'RESPONSE_CACHE_BACKEND', 'shared')
+    shared = build_response_backend()
+    shared_client.cache_clear()
+
+    assert isinstance(memory, MemoryResponseBackend)
+    assert isinstance(shared, SharedResponseBackend)
+    assert shared.prefix == 'fast_zero:responses:'
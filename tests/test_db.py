@@ -1,18 +1,156 @@
-from sqlalchemy import select
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import create_async_engine
 
-from fast_zero.models import User
+from fast_zero.database import ReplicaRouter
+from fast_zero.models import Todo, User
+from fast_zero.routers.todos import (
+    filter_todos,
+    fulltext_todos,
+    search_todos,
+)
+from fast_zero.schemas import FilterTodoSchema
 
 
-def test_db_should_create_user(session):
+@pytest.mark.asyncio
+async def test_db_should_create_user(session):
     user = User(
         username='johndoe', email='johndoe@me.com', password='password'
     )
 
     session.add(user)
-    session.commit()
+    await session.commit()
 
-    result = session.scalar(select(User).where(User.email == 'johndoe@me.com'))
+    result = await session.scalar(
+        select(User).where(User.email == 'johndoe@me.com')
+    )
 
     assert result.username == 'johndoe'
     assert result.email == 'johndoe@me.com'
     assert result.password == 'password'
+
+
+@pytest.mark.asyncio
+async def test_replica_router_should_round_robin_over_replicas(engine):
+    replicas = [create_async_engine(engine.url) for _ in range(2)]
+    router = ReplicaRouter(engine, replicas, retry_after=30, write_window=5)
+
+    first = await router.open_session()
+    second = await router.open_session()
+    third = await router.open_session()
+
+    assert first.bind is replicas[0]
+    assert second.bind is replicas[1]
+    assert third.bind is replicas[0]
+    assert first.info['replica']
+
+    for session in (first, second, third):
+        await session.close()
+
+    for replica in replicas:
+        await replica.dispose()
+
+
+@pytest.mark.asyncio
+async def test_replica_router_should_read_own_writes_from_primary(engine):
+    replica = create_async_engine(engine.url)
+    router = ReplicaRouter(engine, [replica], retry_after=30, write_window=5)
+
+    router.mark_write('test@test.com')
+
+    async with await router.open_session('test@test.com') as session:
+        assert session.bind is engine
+
+    async with await router.open_session('other@test.com') as session:
+        assert session.bind is replica
+
+    await replica.dispose()
+
+
+@pytest.mark.asyncio
+async def test_replica_router_should_fall_back_to_primary_if_replica_is_down(
+    engine,
+):
+    broken = create_async_engine(
+        engine.url.set(database='/missing/fast_zero.db')
+    )
+    router = ReplicaRouter(engine, [broken], retry_after=30, write_window=5)
+
+    async with await router.open_session() as session:
+        assert session.bind is engine
+
+    assert not router.wrote_recently('test@test.com')
+    assert router._down_until[0]
+
+    await broken.dispose()
+
+
+async def explain(session, query):
+    # Bound parameters rather than literal binds, some types such as
+    # REGCONFIG have no literal renderer.
+    compiled = query.compile(dialect=session.bind.dialect)
+    connection = await session.connection()
+
+    # Tiny test tables are always cheaper to scan, so only let the
+    # planner fall back to a sequential scan when no index applies.
+    await session.execute(text('SET LOCAL enable_seqscan = off'))
+    plan = await connection.exec_driver_sql(
+        f'EXPLAIN {compiled}', compiled.params
+    )
+
+    return '\n'.join(plan.scalars().all())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'query',
+    [
+        filter_todos(1, FilterTodoSchema()).offset(20).limit(10),
+        filter_todos(1, FilterTodoSchema(search='title')).limit(10),
+        select(Todo).where(Todo.user_id == 1, Todo.id == 1),
+    ],
+    ids=['read_todos', 'read_todos_search', 'todo_by_id'],
+)
+async def test_todos_queries_should_not_use_seq_scan(session, query):
+    plan = await explain(session, query)
+
+    assert 'Seq Scan' not in plan
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ('query', 'index'),
+    [
+        (
+            filter_todos(1, FilterTodoSchema()).offset(20).limit(10),
+            'ix_todos_user_id_state_id',
+        ),
+        (
+            select(Todo).where(Todo.user_id == 1).order_by(Todo.id).limit(10),
+            'ix_todos_user_id_id',
+        ),
+    ],
+    ids=['read_todos_by_state', 'read_todos_by_owner'],
+)
+async def test_todos_listings_should_use_owner_indexes(session, query, index):
+    plan = await explain(session, query)
+
+    assert index in plan
+
+
+@pytest.mark.asyncio
+async def test_todos_search_should_use_trigram_indexes_not_seq_scan(session):
+    plan = await explain(session, select(Todo).where(search_todos('title')))
+
+    assert 'Seq Scan' not in plan
+    assert 'ix_todos_title_trgm' in plan
+    assert 'ix_todos_description_trgm' in plan
+
+
+@pytest.mark.asyncio
+async def test_todos_fulltext_should_use_search_vector_index(session):
+    condition, _ = fulltext_todos('milk')
+    plan = await explain(session, select(Todo).where(condition))
+
+    assert 'Seq Scan' not in plan
+    assert 'ix_todos_search_vector' in plan
@@ -0,0 +1,74 @@
+from http import HTTPStatus
+
+import pytest
+
+from fast_zero.settings import settings
+from fast_zero.warmup import WarmUpState, warm_up
+
+
+def test_read_liveness_should_return_OK(client):
+    response = client.get('/health/live')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['status'] == 'alive'
+
+
+def test_read_readiness_before_warm_up_should_return_unavailable(
+    client, monkeypatch
+):
+    monkeypatch.setattr('fast_zero.routers.health.warmup_state', WarmUpState())
+
+    response = client.get('/health/ready')
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.json()['status'] == 'warming up'
+
+
+@pytest.mark.asyncio
+async def test_read_readiness_after_warm_up_should_return_OK(
+    client, engine, monkeypatch
+):
+    state = WarmUpState()
+    monkeypatch.setattr('fast_zero.routers.health.warmup_state', state)
+
+    await warm_up(engine, state)
+    response = client.get('/health/ready')
+    data = response.json()
+
+    assert response.status_code == HTTPStatus.OK
+    assert data['status'] == 'ready'
+    assert data['attempts'] == 1
+    assert data['warmup_seconds'] > 0
+
+
+@pytest.mark.asyncio
+async def test_warm_up_should_leave_connections_idle_in_pool(session, engine):
+    state = WarmUpState()
+
+    await warm_up(engine, state)
+
+    assert state.ready
+    assert engine.pool.checkedout() == 0
+
+
+@pytest.mark.asyncio
+async def test_warm_up_should_retry_a_failed_attempt(
+    session, engine, monkeypatch, caplog
+):
+    failures = [RuntimeError('worker died')]
+
+    async def warm_hasher():
+        if failures:
+            raise failures.pop()
+
+    monkeypatch.setattr('fast_zero.warmup.warm_hasher', warm_hasher)
+    monkeypatch.setattr(settings, 'WARMUP_RETRY_SECONDS', 0)
+    state = WarmUpState()
+    expected_attempts = 2
+
+    await warm_up(engine, state)
+
+    assert state.ready
+    assert state.attempts == expected_attempts
+    assert 'worker died' in state.last_error
+    assert 'Warm-up attempt 1 failed' in caplog.text
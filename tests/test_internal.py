@@ -0,0 +1,39 @@
+from http import HTTPStatus
+
+from fast_zero.settings import settings
+
+
+def test_read_pool_status_should_return_OK_and_pool_counters(
+    client, internal_headers
+):
+    response = client.get('/internal/pool', headers=internal_headers)
+    data = response.json()
+
+    assert response.status_code == HTTPStatus.OK
+    assert data['size'] == settings.DATABASE_POOL_SIZE
+    assert data['max_overflow'] == settings.DATABASE_MAX_OVERFLOW
+    assert data['checked_out'] >= 0
+    assert data['idle'] >= 0
+    assert data['wait_time_avg'] >= 0
+
+
+def test_internal_endpoints_should_be_absent_without_a_token(client):
+    response = client.get('/internal/pool')
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_internal_endpoints_should_reject_a_wrong_token(
+    client, internal_headers
+):
+    response = client.get(
+        '/internal/pool', headers={'X-Internal-Token': 'wrong'}
+    )
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+def test_internal_endpoints_should_stay_out_of_the_schema(client):
+    paths = client.get('/openapi.json').json()['paths']
+
+    assert not [path for path in paths if path.startswith('/internal')]
@@ -0,0 +1,27 @@
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, text
+
+from fast_zero.migrate import alembic_config, is_at_head
+
+
+def test_is_at_head_should_compare_the_stored_revision_with_the_scripts(
+    tmp_path,
+):
+    url = f'sqlite:///{tmp_path / "db.sqlite"}'
+    config = alembic_config()
+    (head,) = ScriptDirectory.from_config(config).get_heads()
+
+    fresh = is_at_head(config, url)
+
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(
+            text('CREATE TABLE alembic_version (version_num VARCHAR(32))')
+        )
+        connection.execute(
+            text('INSERT INTO alembic_version VALUES (:head)'), {'head': head}
+        )
+    engine.dispose()
+
+    assert not fresh
+    assert is_at_head(config, url)
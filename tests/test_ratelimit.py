@@ -0,0 +1,52 @@
+import pytest
+
+from fast_zero.ratelimit import MemoryBackend, SharedBackend, build_backend
+from fast_zero.settings import settings
+from fast_zero.store import shared_client
+
+
+class FakeScriptClient:
+    """Runs nothing, returning `replies` in turn as Redis would: bytes."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = []
+
+    async def eval(self, script, numkeys, *args):
+        self.calls.append((numkeys, *args))
+
+        return self.replies.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_shared_backend_should_take_from_a_prefixed_bucket():
+    client = FakeScriptClient(b'0', b'1.5')
+    backend = SharedBackend(client)
+
+    first = await backend.take('ip:1.2.3.4', 20, 1 / 3)
+    second = await backend.take('ip:1.2.3.4', 20, 1 / 3)
+
+    assert [first, second] == [0, 1.5]
+    assert client.calls[0] == (1, 'fast_zero:login:ip:1.2.3.4', 20, 1 / 3)
+
+
+def test_build_backend_should_follow_the_setting(monkeypatch):
+    monkeypatch.setattr(settings, 'REDIS_URL', 'redis://localhost:6379/0')
+    shared_client.cache_clear()
+
+    monkeypatch.setattr(settings, 'LOGIN_RATE_LIMIT_BACKEND', 'memory')
+    memory = build_backend()
+    monkeypatch.setattr(settings, 'LOGIN_RATE_LIMIT_BACKEND', 'shared')
+    shared = build_backend()
+    shared_client.cache_clear()
+
+    assert isinstance(memory, MemoryBackend)
+    assert isinstance(shared, SharedBackend)
+
+
+def test_shared_client_should_require_a_redis_url(monkeypatch):
+    monkeypatch.setattr(settings, 'REDIS_URL', None)
+    shared_client.cache_clear()
+
+    with pytest.raises(RuntimeError, match='REDIS_URL'):
+        shared_client()
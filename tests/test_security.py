@@ -1,7 +1,14 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
 from http import HTTPStatus
 
+import pytest
+from freezegun import freeze_time
 from jwt import decode
 
+from fast_zero.cache import TTLCache
+from fast_zero.hashing import HashPool, HashPoolBusy
 from fast_zero.security import create_access_token
 from fast_zero.settings import settings
 
@@ -25,3 +32,152 @@ def test_security_should_be_raise_error_if_token_is_invalid(client):
 
     assert response.status_code == HTTPStatus.UNAUTHORIZED
     assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_security_should_cache_the_current_user_until_it_is_deleted(
+    client, user, token, internal_headers
+):
+    headers = {'Authorization': f'Bearer {token}'}
+
+    client.get('/todos/', headers=headers)
+    client.get('/todos/', headers=headers)
+    stats = client.get('/internal/cache', headers=internal_headers).json()
+    stats = stats['users']
+
+    client.delete(f'/users/{user.id}', headers=headers)
+    response = client.get('/todos/', headers=headers)
+
+    assert stats['size'] == 1
+    assert stats['hits'] >= 1
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_ttl_cache_should_evict_least_recently_used_and_expired_keys():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    expired = TTLCache(max_size=2, ttl=-1)
+    expired.set('a', 1)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.evictions == 1
+    assert expired.get('a') is None
+
+
+def test_security_should_put_user_id_and_version_in_the_token(user, token):
+    claims = decode(
+        token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+    )
+
+    assert claims['sub'] == user.email
+    assert claims['uid'] == user.id
+    assert claims['ver'] == user.version
+
+
+def test_security_should_reject_tokens_older_than_the_user_version(
+    client, user, token
+):
+    headers = {'Authorization': f'Bearer {token}'}
+
+    client.put(
+        f'/users/{user.id}',
+        headers=headers,
+        json={
+            'username': user.username,
+            'email': user.email,
+            'password': 'new-password',
+        },
+    )
+    response = client.get('/todos/', headers=headers)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_security_stateless_mode_should_skip_the_user_lookup(
+    client, user, token, statements, monkeypatch
+):
+    monkeypatch.setattr(settings, 'AUTH_STATELESS', True)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    with statements() as executed:
+        response = client.get('/todos/', headers=headers)
+
+    client.delete(f'/users/{user.id}', headers=headers)
+    revoked = client.get('/todos/', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(executed) == 1
+    assert revoked.status_code == HTTPStatus.UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_hash_pool_should_reject_calls_past_the_queue_size():
+    pool = HashPool(workers=1, queue_size=0)
+
+    try:
+        results = await asyncio.gather(
+            pool.run(pow, 2, 10),
+            pool.run(pow, 2, 10),
+            return_exceptions=True,
+        )
+    finally:
+        pool.shutdown()
+
+    assert results[0] == 2**10
+    assert isinstance(results[1], HashPoolBusy)
+    assert pool.stats()['rejected'] == 1
+    assert pool.stats()['completed'] == 1
+
+
+@pytest.mark.asyncio
+async def test_hash_pool_should_replace_a_broken_executor():
+    pool = HashPool(workers=1, queue_size=0)
+
+    try:
+        with pytest.raises(HashPoolBusy):
+            await pool.run(os._exit, 1)
+
+        result = await pool.run(pow, 2, 10)
+    finally:
+        pool.shutdown()
+
+    assert result == 2**10
+    assert pool.stats()['restarts'] == 1
+
+
+def test_read_hash_pool_stats_should_count_login_hashing(
+    client, token, internal_headers
+):
+    response = client.get('/internal/hashing', headers=internal_headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['completed'] >= 1
+    assert response.json()['queued'] == 0
+
+
+def test_security_should_verify_each_token_once_until_it_expires(
+    client, token, internal_headers
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    before = client.get('/internal/cache', headers=internal_headers).json()
+    before = before['tokens']
+
+    client.get('/todos/', headers=headers)
+    client.get('/todos/', headers=headers)
+    stats = client.get('/internal/cache', headers=internal_headers).json()
+    stats = stats['tokens']
+
+    with freeze_time(
+        datetime.now()
+        + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    ):
+        expired = client.get('/todos/', headers=headers)
+
+    assert stats['misses'] - before['misses'] == 1
+    assert stats['hits'] - before['hits'] == 1
+    assert stats['time_saved'] > 0
+    assert expired.status_code == HTTPStatus.UNAUTHORIZED
@@ -0,0 +1,27 @@
+from fast_zero.serve import build_config
+from fast_zero.settings import settings
+
+
+def test_build_config_should_take_server_options_from_settings():
+    config = build_config()
+
+    assert config.workers == settings.SERVER_WORKERS
+    assert config.backlog == settings.SERVER_BACKLOG
+    assert config.timeout_keep_alive == settings.SERVER_KEEP_ALIVE
+    assert config.timeout_graceful_shutdown == settings.SERVER_GRACEFUL_TIMEOUT
+    assert config.limit_max_requests == settings.SERVER_MAX_REQUESTS
+
+
+def test_worker_config_should_add_jitter_to_max_requests_on_load(monkeypatch):
+    monkeypatch.setattr(settings, 'SERVER_MAX_REQUESTS', 100)
+    monkeypatch.setattr(settings, 'SERVER_MAX_REQUESTS_JITTER', 10)
+    config = build_config()
+
+    config.load()
+
+    assert (
+        settings.SERVER_MAX_REQUESTS
+        <= config.limit_max_requests
+        <= settings.SERVER_MAX_REQUESTS + settings.SERVER_MAX_REQUESTS_JITTER
+    )
+    assert config.loaded
@@ -1,6 +1,12 @@
+import csv
+import io
+import json
 from http import HTTPStatus
 
+import pytest
+
 from fast_zero.models import TodoState
+from fast_zero.settings import settings
 from tests.conftest import TodoFactory
 
 
@@ -26,12 +32,72 @@ def test_create_todo_should_return_CREATED_and_todos(client, token):
     }
 
 
-def test_read_todo_should_return_OK_and_list_of_5_todos(
+def test_create_todos_should_return_CREATED_and_todos_in_order(client, token):
+    response = client.post(
+        '/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'todos': [
+                {'title': f'title_{i}', 'description': 'bulk', 'state': 'todo'}
+                for i in range(3)
+            ]
+        },
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert [todo['id'] for todo in response.json()['todos']] == [1, 2, 3]
+    assert [todo['title'] for todo in response.json()['todos']] == [
+        'title_0',
+        'title_1',
+        'title_2',
+    ]
+
+
+def test_create_todos_should_report_invalid_items_and_create_nothing(
+    client, token
+):
+    response = client.post(
+        '/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'todos': [
+                {'title': 'valid', 'description': 'bulk', 'state': 'todo'},
+                {'title': 'invalid', 'description': 'bulk', 'state': 'nope'},
+            ]
+        },
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert [error['loc'] for error in response.json()['detail']] == [
+        ['body', 'todos', 1, 'state']
+    ]
+
+    response = client.get(
+        '/todos/?state=todo', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.json()['todos'] == []
+
+
+def test_create_todos_should_reject_more_items_than_allowed(client, token):
+    todo = {'title': 'title', 'description': 'bulk', 'state': 'todo'}
+
+    response = client.post(
+        '/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'todos': [todo] * (settings.TODO_BULK_MAX_ITEMS + 1)},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_read_todo_should_return_OK_and_list_of_5_todos(
     session, client, user, token
 ):
     expected_todos = 5
-    session.bulk_save_objects(TodoFactory.create_batch(5, user_id=user.id))
-    session.commit()
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
 
     response = client.get(
         '/todos', headers={'Authorization': f'Bearer {token}'}
@@ -41,12 +107,13 @@ def test_read_todo_should_return_OK_and_list_of_5_todos(
     assert len(response.json()['todos']) == expected_todos
 
 
-def test_read_todo_should_return_OK_by_offset_and_limit(
+@pytest.mark.asyncio
+async def test_read_todo_should_return_OK_by_offset_and_limit(
     session, client, user, token
 ):
     expected_todos = 2
-    session.bulk_save_objects(TodoFactory.create_batch(5, user_id=user.id))
-    session.commit()
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
 
     response = client.get(
         '/todos/?offset=1&limit=2',
@@ -57,14 +124,107 @@ def test_read_todo_should_return_OK_by_offset_and_limit(
     assert len(response.json()['todos']) == expected_todos
 
 
-def test_read_todo_should_return_OK_by_search_with_title(
+@pytest.mark.asyncio
+async def test_read_todo_should_walk_all_pages_by_cursor(
+    session, client, user, token
+):
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
+
+    response = client.get(
+        '/todos/?limit=3', headers={'Authorization': f'Bearer {token}'}
+    )
+    first_page = response.json()
+
+    response = client.get(
+        '/todos/',
+        params={'limit': 3, 'cursor': first_page['next_cursor']},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    second_page = response.json()
+
+    assert response.status_code == HTTPStatus.OK
+    assert [todo['id'] for todo in first_page['todos']] == [1, 2, 3]
+    assert [todo['id'] for todo in second_page['todos']] == [4, 5]
+    assert second_page['next_cursor'] is None
+
+
+@pytest.mark.asyncio
+async def test_read_todo_fulltext_should_walk_pages_by_rank_cursor(
+    session, client, user, token
+):
+    session.add_all([
+        TodoFactory(user_id=user.id, title='milk', description='buy milk'),
+        TodoFactory(user_id=user.id, title='milk', description='errands'),
+        TodoFactory(user_id=user.id, title='groceries', description='milk'),
+    ])
+    await session.commit()
+
+    response = client.get(
+        '/todos/',
+        params={'search': 'milk', 'mode': 'fulltext', 'limit': 2},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    first_page = response.json()
+
+    response = client.get(
+        '/todos/',
+        params={
+            'search': 'milk',
+            'mode': 'fulltext',
+            'limit': 2,
+            'cursor': first_page['next_cursor'],
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    second_page = response.json()
+
+    assert [todo['id'] for todo in first_page['todos']] == [1, 2]
+    assert [todo['id'] for todo in second_page['todos']] == [3]
+    assert second_page['next_cursor'] is None
+
+
+@pytest.mark.asyncio
+async def test_read_todo_fulltext_should_walk_tied_ranks_by_id(
+    session, client, user, token
+):
+    expected_ids = [1, 2, 3, 4, 5]
+    session.add_all(
+        TodoFactory.create_batch(
+            5, user_id=user.id, title='milk', description='errands'
+        )
+    )
+    await session.commit()
+
+    ids = []
+    params = {'search': 'milk', 'mode': 'fulltext', 'limit': 2}
+
+    while True:
+        response = client.get(
+            '/todos/',
+            params=params,
+            headers={'Authorization': f'Bearer {token}'},
+        )
+        page = response.json()
+        ids.extend(todo['id'] for todo in page['todos'])
+
+        if not page['next_cursor']:
+            break
+
+        params['cursor'] = page['next_cursor']
+
+    assert ids == expected_ids
+
+
+@pytest.mark.asyncio
+async def test_read_todo_should_return_OK_by_search_with_title(
     session, client, user, token
 ):
     expected_todos = 5
-    session.bulk_save_objects(
+    session.add_all(
         TodoFactory.create_batch(5, user_id=user.id, title='valid_title')
     )
-    session.commit()
+    await session.commit()
 
     response = client.get(
         '/todos/?search=valid_title',
@@ -75,14 +235,15 @@ def test_read_todo_should_return_OK_by_search_with_title(
     assert len(response.json()['todos']) == expected_todos
 
 
-def test_read_todo_should_return_OK_by_search_with_description(
+@pytest.mark.asyncio
+async def test_read_todo_should_return_OK_by_search_with_description(
     session, client, user, token
 ):
     expected_todos = 5
-    session.bulk_save_objects(
+    session.add_all(
         TodoFactory.create_batch(5, user_id=user.id, description='valid_title')
     )
-    session.commit()
+    await session.commit()
 
     response = client.get(
         '/todos/?search=valid_title',
@@ -93,12 +254,65 @@ def test_read_todo_should_return_OK_by_search_with_description(
     assert len(response.json()['todos']) == expected_todos
 
 
-def test_read_todo_should_return_OK_by_state(session, client, user, token):
+@pytest.mark.asyncio
+async def test_read_todo_should_match_search_wildcards_literally(
+    session, client, user, token
+):
+    session.add_all(
+        TodoFactory.create_batch(3, user_id=user.id, title='plain title')
+    )
+    session.add(TodoFactory(user_id=user.id, title='100% done'))
+    await session.commit()
+
+    response = client.get(
+        '/todos/?search=%25',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [todo['title'] for todo in response.json()['todos']] == [
+        '100% done'
+    ]
+
+
+@pytest.mark.asyncio
+async def test_read_todo_fulltext_should_rank_title_matches_first(
+    session, client, user, token
+):
+    session.add_all([
+        TodoFactory(
+            user_id=user.id, title='errands', description='buy some milk'
+        ),
+        TodoFactory(
+            user_id=user.id, title='buy milk', description='at the market'
+        ),
+        TodoFactory(
+            user_id=user.id, title='laundry', description='wash the sheets'
+        ),
+    ])
+    await session.commit()
+
+    response = client.get(
+        '/todos/?search=buying&mode=fulltext',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [todo['title'] for todo in response.json()['todos']] == [
+        'buy milk',
+        'errands',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_read_todo_should_return_OK_by_state(
+    session, client, user, token
+):
     expected_todos = 5
-    session.bulk_save_objects(
+    session.add_all(
         TodoFactory.create_batch(5, user_id=user.id, state=TodoState.draft)
     )
-    session.commit()
+    await session.commit()
 
     response = client.get(
         '/todos/?state=draft',
@@ -109,16 +323,17 @@ def test_read_todo_should_return_OK_by_state(session, client, user, token):
     assert len(response.json()['todos']) == expected_todos
 
 
-def test_read_todo_should_return_OK_by_search_state_and_limit(
+@pytest.mark.asyncio
+async def test_read_todo_should_return_OK_by_search_state_and_limit(
     session, client, user, token
 ):
     expected_todos = 2
-    session.bulk_save_objects(
+    session.add_all(
         TodoFactory.create_batch(
             2, user_id=user.id, title='valid_title', state=TodoState.draft
         )
     )
-    session.bulk_save_objects(
+    session.add_all(
         TodoFactory.create_batch(
             3,
             user_id=user.id,
@@ -126,7 +341,7 @@ def test_read_todo_should_return_OK_by_search_state_and_limit(
             state=TodoState.done,
         )
     )
-    session.commit()
+    await session.commit()
 
     response = client.get(
         '/todos/?search=valid_title&state=draft&limit=2',
@@ -150,10 +365,13 @@ def test_read_todo_should_return_OK_by_search_state_and_limit(
     assert response.json()['todos'][0]['state'] == 'done'
 
 
-def test_delete_todo_should_return_OK_by_id(session, client, user, token):
+@pytest.mark.asyncio
+async def test_delete_todo_should_return_OK_by_id(
+    session, client, user, token
+):
     todo = TodoFactory.create(user_id=user.id)
     session.add(todo)
-    session.commit()
+    await session.commit()
 
     response = client.delete(
         f'/todos/{todo.id}', headers={'Authorization': f'Bearer {token}'}
@@ -165,12 +383,13 @@ def test_delete_todo_should_return_OK_by_id(session, client, user, token):
     }
 
 
-def test_delete_todo_should_return_NOT_FOUND_if_id_is_invalid(
+@pytest.mark.asyncio
+async def test_delete_todo_should_return_NOT_FOUND_if_id_is_invalid(
     session, client, user, token
 ):
     todo = TodoFactory.create(user_id=user.id)
     session.add(todo)
-    session.commit()
+    await session.commit()
 
     fake_id = 3
 
@@ -182,13 +401,14 @@ def test_delete_todo_should_return_NOT_FOUND_if_id_is_invalid(
     assert response.json() == {'detail': f'Task with id {fake_id} not found'}
 
 
-def test_update_todo_should_return_OK_if_id_is_valid(
+@pytest.mark.asyncio
+async def test_update_todo_should_return_OK_if_id_is_valid(
     session, client, user, token
 ):
     todo = TodoFactory.create(user_id=user.id)
 
     session.add(todo)
-    session.commit()
+    await session.commit()
 
     response = client.patch(
         f'/todos/{todo.id}',
@@ -218,3 +438,346 @@ def test_update_todo_should_return_NOT_FOUND_if_id_is_invalid(client, token):
 
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert response.json() == {'detail': f'Task with id {fake_id} not found'}
+
+
+@pytest.mark.asyncio
+async def test_update_todos_should_return_OK_and_ids_by_filter(
+    session, client, user, other_user, token
+):
+    session.add_all(
+        TodoFactory.create_batch(3, user_id=user.id, state=TodoState.done)
+    )
+    session.add(TodoFactory(user_id=user.id, state=TodoState.doing))
+    session.add(TodoFactory(user_id=other_user.id, state=TodoState.done))
+    await session.commit()
+
+    response = client.patch(
+        '/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'filter': {'state': 'done'}, 'changes': {'state': 'trash'}},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'ids': [1, 2, 3], 'count': 3}
+
+    response = client.get(
+        '/todos/?state=trash', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert [todo['id'] for todo in response.json()['todos']] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_update_todos_should_only_touch_own_todos_by_ids(
+    session, client, user, other_user, token
+):
+    session.add(TodoFactory(user_id=user.id))
+    session.add(TodoFactory(user_id=other_user.id))
+    await session.commit()
+
+    response = client.patch(
+        '/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'ids': [1, 2], 'changes': {'title': 'renamed'}},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'ids': [1], 'count': 1}
+
+
+def test_update_todos_should_require_ids_or_filter(client, token):
+    response = client.patch(
+        '/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'ids': [1],
+            'filter': {'state': 'done'},
+            'changes': {'state': 'trash'},
+        },
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_update_todos_should_require_changes(client, token):
+    response = client.patch(
+        '/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'ids': [1], 'changes': {}},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_delete_todos_should_return_OK_and_deleted_ids(
+    session, client, user, token
+):
+    session.add_all(
+        TodoFactory.create_batch(2, user_id=user.id, state=TodoState.trash)
+    )
+    session.add(TodoFactory(user_id=user.id, state=TodoState.todo))
+    await session.commit()
+
+    response = client.request(
+        'DELETE',
+        '/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'filter': {'state': 'trash'}},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'ids': [1, 2], 'count': 2}
+
+    response = client.get(
+        '/todos/?state=todo', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert len(response.json()['todos']) == 1
+
+
+@pytest.mark.asyncio
+async def test_delete_todos_by_filter_without_state_should_match_every_state(
+    session, client, user, token
+):
+    session.add_all([
+        TodoFactory(user_id=user.id, title='milk', state=TodoState.draft),
+        TodoFactory(user_id=user.id, title='milk', state=TodoState.done),
+        TodoFactory(user_id=user.id, title='bread', state=TodoState.done),
+    ])
+    await session.commit()
+
+    response = client.request(
+        'DELETE',
+        '/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'filter': {'search': 'milk'}},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'ids': [1, 2], 'count': 2}
+
+
+@pytest.mark.asyncio
+async def test_todo_writes_should_run_one_statement_besides_auth(
+    session, client, user, token, statements
+):
+    session.add(TodoFactory(user_id=user.id))
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    todo = {'title': 'title', 'description': 'description', 'state': 'todo'}
+
+    with statements() as created:
+        client.post('/todos', headers=headers, json=todo)
+
+    with statements() as updated:
+        client.patch('/todos/1', headers=headers, json={'title': 'new'})
+
+    with statements() as deleted:
+        client.delete('/todos/1', headers=headers)
+
+    # Only the first request looks the token user up, later ones hit the cache
+    assert [statement.split()[0] for statement in created] == [
+        'SELECT',
+        'INSERT',
+    ]
+    assert [statement.split()[0] for statement in updated] == ['UPDATE']
+    assert [statement.split()[0] for statement in deleted] == ['DELETE']
+
+
+@pytest.mark.asyncio
+async def test_export_todos_should_stream_ndjson_lines(
+    session, client, user, token
+):
+    expected_todos = 5
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    session.add(TodoFactory(user_id=user.id, state=TodoState.done))
+    await session.commit()
+
+    response = client.get(
+        '/todos/export', headers={'Authorization': f'Bearer {token}'}
+    )
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert len(lines) == expected_todos
+    assert [line['id'] for line in lines] == [1, 2, 3, 4, 5]
+    assert set(lines[0]) == {
+        'id',
+        'title',
+        'description',
+        'state',
+        'created_at',
+        'updated_at',
+    }
+
+
+@pytest.mark.asyncio
+async def test_export_todos_should_stream_csv_with_filters(
+    session, client, user, token
+):
+    session.add_all(
+        TodoFactory.create_batch(2, user_id=user.id, state=TodoState.done)
+    )
+    session.add(TodoFactory(user_id=user.id, state=TodoState.todo))
+    await session.commit()
+
+    response = client.get(
+        '/todos/export?format=csv&state=done',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/csv')
+    assert [row['id'] for row in rows] == ['1', '2']
+    assert {row['state'] for row in rows} == {'done'}
+
+
+def test_import_todos_should_copy_valid_ndjson_rows(client, token):
+    body = '\n'.join([
+        json.dumps({'title': 'a', 'description': 'a', 'state': 'draft'}),
+        '',
+        json.dumps({'title': 'b', 'description': 'b', 'state': 'done'}),
+        '{not json',
+        json.dumps({'title': 'c', 'state': 'unknown'}),
+    ])
+
+    response = client.post(
+        '/todos/import',
+        content=body,
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    listing = client.get(
+        '/todos/?state=done', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    result = response.json()
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert (result['imported'], result['rejected']) == (2, 2)
+    assert [error['line'] for error in result['errors']] == [4, 5]
+    assert [todo['title'] for todo in listing.json()['todos']] == ['b']
+
+
+def test_import_todos_should_read_csv_with_header(client, token):
+    body = 'title,description,state\nfirst,one,todo\nsecond,two,nope\n'
+
+    response = client.post(
+        '/todos/import?format=csv',
+        content=body,
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json() == {
+        'imported': 1,
+        'rejected': 1,
+        'errors': [
+            {
+                'line': 3,
+                'errors': [
+                    "state: Input should be 'draft', 'todo', 'doing', "
+                    "'done' or 'trash'"
+                ],
+            }
+        ],
+    }
+
+
+def test_import_todos_should_skip_csv_bom_and_reject_nul_rows(client, token):
+    body = (
+        '\ufefftitle,description,state\nfirst,one,todo\nsec\x00ond,two,todo\n'
+    )
+
+    response = client.post(
+        '/todos/import?format=csv',
+        content=body.encode(),
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json() == {
+        'imported': 1,
+        'rejected': 1,
+        'errors': [
+            {'line': 3, 'errors': ['title: NUL characters are not allowed']}
+        ],
+    }
+
+
+def test_import_todos_should_not_report_json_null_as_invalid_json(
+    client, token
+):
+    response = client.post(
+        '/todos/import',
+        content='null\n',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json()['errors'] == [
+        {
+            'line': 1,
+            'errors': [
+                'record: Input should be a valid dictionary or instance of '
+                'TodoSchema'
+            ],
+        }
+    ]
+
+
+def test_import_todos_should_refuse_uploads_over_the_size_limit(
+    client, token, monkeypatch
+):
+    monkeypatch.setattr(settings, 'TODO_IMPORT_MAX_BYTES', 10)
+    body = json.dumps({'title': 'a', 'description': 'a', 'state': 'draft'})
+
+    response = client.post(
+        '/todos/import',
+        content=body,
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    listing = client.get(
+        '/todos/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    assert response.json() == {'detail': 'Upload too large'}
+    assert listing.json()['todos'] == []
+
+
+def test_import_todos_should_reject_non_utf8_body(client, token):
+    response = client.post(
+        '/todos/import',
+        content=b'\xff\xfe\x00',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Could not read the uploaded file'}
+
+
+@pytest.mark.asyncio
+async def test_read_todos_should_return_NOT_MODIFIED_until_a_todo_changes(
+    session, client, user, token
+):
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    first = client.get('/todos/?limit=2', headers=headers)
+    cached = client.get(
+        '/todos/?limit=2',
+        headers=headers | {'If-None-Match': first.headers['ETag']},
+    )
+    client.patch('/todos/3', headers=headers, json={'title': 'changed'})
+    changed = client.get(
+        '/todos/?limit=2',
+        headers=headers | {'If-None-Match': first.headers['ETag']},
+    )
+
+    assert cached.status_code == HTTPStatus.NOT_MODIFIED
+    assert not cached.content
+    assert changed.status_code == HTTPStatus.OK
@@ -1,5 +1,9 @@
 from http import HTTPStatus
 
+import pytest
+
+from fast_zero.app import app
+from fast_zero.database import get_read_session
 from tests.conftest import UserFactory
 
 
@@ -55,13 +59,14 @@ def test_read_users_should_return_OK_and_empty_list(client):
     response = client.get('/users')
 
     assert response.status_code == HTTPStatus.OK
-    assert response.json() == {'users': []}
+    assert response.json() == {'users': [], 'next_cursor': None}
 
 
-def test_read_users_should_return_OK_and_users_list(client, session):
+@pytest.mark.asyncio
+async def test_read_users_should_return_OK_and_users_list(client, session):
     expected_users = 5
-    session.bulk_save_objects(UserFactory.create_batch(5))
-    session.commit()
+    session.add_all(UserFactory.create_batch(5))
+    await session.commit()
 
     response = client.get('/users')
 
@@ -69,6 +74,39 @@ def test_read_users_should_return_OK_and_users_list(client, session):
     assert len(response.json()['users']) == expected_users
 
 
+@pytest.mark.asyncio
+async def test_read_users_should_walk_all_pages_by_cursor(client, session):
+    session.add_all(UserFactory.create_batch(5))
+    await session.commit()
+
+    expected_pages = 3
+    ids, cursor, pages = [], None, 0
+
+    while True:
+        params = {'limit': 2} | ({'cursor': cursor} if cursor else {})
+        response = client.get('/users', params=params)
+        data = response.json()
+
+        assert response.status_code == HTTPStatus.OK
+
+        ids += [user['id'] for user in data['users']]
+        cursor = data['next_cursor']
+        pages += 1
+
+        if not cursor:
+            break
+
+    assert ids == [1, 2, 3, 4, 5]
+    assert pages == expected_pages
+
+
+def test_read_users_should_return_BAD_REQUEST_if_cursor_is_invalid(client):
+    response = client.get('/users', params={'cursor': 'not-a-cursor'})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
 def test_read_user_should_return_OK_and_user(client, user):
     response = client.get(f'/users/{user.id}')
 
@@ -179,3 +217,149 @@ def test_delete_user_should_return_FORBIDDEN_if_id_is_invalid(
 
     assert response.status_code == HTTPStatus.FORBIDDEN
     assert response.json() == {'detail': 'Not enough permissions'}
+
+
+def test_user_writes_should_not_reload_the_written_row(
+    client, user, token, statements
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    new_user = {
+        'username': 'johndoe',
+        'email': 'johndoe@me.com',
+        'password': 'password',
+    }
+
+    with statements() as created:
+        client.post('/users', json=new_user)
+
+    with statements() as updated:
+        client.put(
+            f'/users/{user.id}',
+            headers=headers,
+            json=new_user | {'username': 'janedoe', 'email': 'jane@me.com'},
+        )
+
+    # create_user checks for duplicates first, update_user authenticates
+    assert [statement.split()[0] for statement in created] == [
+        'SELECT',
+        'INSERT',
+    ]
+    assert [statement.split()[0] for statement in updated] == [
+        'SELECT',
+        'UPDATE',
+    ]
+
+
+def test_read_user_by_id_should_return_NOT_MODIFIED_for_a_matching_etag(
+    client, user, token
+):
+    first = client.get(f'/users/{user.id}')
+    cached = client.get(
+        f'/users/{user.id}', headers={'If-None-Match': first.headers['ETag']}
+    )
+    client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'username': 'renamed',
+            'email': user.email,
+            'password': user.clean_password,
+        },
+    )
+    changed = client.get(
+        f'/users/{user.id}', headers={'If-None-Match': first.headers['ETag']}
+    )
+
+    assert first.headers['ETag'].startswith('W/"')
+    assert cached.status_code == HTTPStatus.NOT_MODIFIED
+    assert not cached.content
+    assert changed.status_code == HTTPStatus.OK
+    assert changed.json()['username'] == 'renamed'
+    assert changed.headers['ETag'] != first.headers['ETag']
+
+
+def test_read_users_should_validate_the_page_etag(client, user, other_user):
+    first = client.get('/users/?limit=1')
+    cached = client.get(
+        '/users/?limit=1', headers={'If-None-Match': first.headers['ETag']}
+    )
+    other_page = client.get(
+        '/users/?limit=1&offset=1',
+        headers={'If-None-Match': first.headers['ETag']},
+    )
+
+    assert cached.status_code == HTTPStatus.NOT_MODIFIED
+    assert cached.headers['ETag'] == first.headers['ETag']
+    assert other_page.status_code == HTTPStatus.OK
+
+
+def test_read_user_by_id_should_be_served_from_the_response_cache(
+    client, user, other_user, token, statements
+):
+    client.get(f'/users/{user.id}')
+    client.get(f'/users/{other_user.id}')
+
+    with statements() as cached:
+        response = client.get(f'/users/{user.id}')
+
+    client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'username': 'renamed',
+            'email': user.email,
+            'password': user.clean_password,
+        },
+    )
+
+    with statements() as after_update:
+        updated = client.get(f'/users/{user.id}')
+        client.get(f'/users/{other_user.id}')
+
+    assert response.json()['username'] == user.username
+    assert not cached
+    assert updated.json()['username'] == 'renamed'
+    assert len(after_update) == 1
+
+
+def test_read_users_should_fill_the_response_cache_from_the_primary(
+    client, user, monkeypatch
+):
+    def replica_session():
+        pytest.fail('Cached reads must not use a replica')
+
+    monkeypatch.setitem(
+        app.dependency_overrides, get_read_session, replica_session
+    )
+
+    assert client.get('/users/').status_code == HTTPStatus.OK
+    assert client.get(f'/users/{user.id}').status_code == HTTPStatus.OK
+
+
+def test_create_user_should_only_invalidate_the_last_users_page(
+    client, user, other_user, statements, internal_headers
+):
+    client.get('/users/?limit=1')
+    client.get('/users/?limit=1&offset=1')
+
+    client.post(
+        '/users/',
+        json={
+            'username': 'newcomer',
+            'email': 'newcomer@test.com',
+            'password': 'secret',
+        },
+    )
+
+    with statements() as first_page:
+        client.get('/users/?limit=1')
+
+    with statements() as last_page:
+        response = client.get('/users/?limit=1&offset=1')
+
+    assert not first_page
+    stats = client.get('/internal/cache/responses', headers=internal_headers)
+
+    assert len(last_page) == 1
+    assert response.json()['next_cursor']
+    assert stats.json()['hits'] >= 1